@@ -0,0 +1,402 @@
+from pyscripts.bitmap_posting_list import BitmapPostingList
+from pyscripts.posting_cursor import FixedWidthPostingCursor, ListPostingCursor, VarintPostingCursor
+from pyscripts.smart_disc_interfacer import SmartDiscInterfacer
+
+
+class AdaptiveDiscInterfacer(SmartDiscInterfacer):
+    """
+    Empty class to encode every posting list with the codec giving the smallest encoding for this list.
+    A posting list is encoded as :
+    <key_size(key_len_len bytes)><key(key_size bytes)><list_len(list_len_len bytes)><codec(1 byte)><encoded list>
+    where the encoded list depends on the codec :
+        - FIXED : (<doc_id(id_len bytes)><score(score_len bytes)>)*N, as NaiveDiscInterfacer
+        - VARINT : (<delta_doc_id (variable length)><score (variable length)>)*N
+        - BITPACKED : <N (variable length)><first_doc_id (variable length)><min_score (variable length)>
+                      <gap_bits(1 byte)><score_bits(1 byte)><packed gaps><packed scores>
+          where the gaps between doc_ids and the scores minus min_score are packed over a fixed number of bits
+        - BITMAP : <N (variable length)><first_doc_id (variable length)><range_len (variable length)>
+                   <min_score (variable length)><score_bits(1 byte)><bitmap(ceil(range_len / 8) bytes)><packed scores>
+          where the ith bit of the bitmap is set iff first_doc_id + i is in the list
+        - ROARING : the encoding of a BitmapPostingList (see BitmapPostingList.encode), decoded as a BitmapPostingList
+          so that queries can intersect it with vectorized operations
+    Packed values are grouped by 8, so that a group of values packed over b bits takes exactly b bytes.
+    The dense posting lists are encoded with ROARING whatever their size, the other ones with the smallest codec.
+
+    Class Attributes :
+        - codecs : list of integer, the codecs tried, in order of preference when two encodings have the same size
+          (the fastest to decode first)
+        - dense_threshold : float, the density (number of doc_ids over the range of doc_ids) from which a posting list
+          is dense. None (default) to never use ROARING. Can be overridden when saving an inverted file
+        - dense_min_len : integer, the minimal length of a dense posting list, shorter lists being faster to intersect
+          as lists of tuples
+    """
+
+    format_name = 'adaptive'
+
+    FIXED = 0
+    VARINT = 1
+    BITPACKED = 2
+    BITMAP = 3
+    ROARING = 4
+    codecs = [FIXED, BITMAP, BITPACKED, VARINT]
+    dense_threshold = None
+    dense_min_len = 1024
+
+    def __init__(self):
+        super().__init__()
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#--------------------------------------------------------ADAPTIVE ENCODING---------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    @classmethod
+    def _pack(cls, values, bits):
+        """
+        Pack a list of non negative integers over a fixed number of bits per value, by groups of 8
+        :param values: list of integer, the values to pack, each one lower than 2**bits
+        :param bits: integer, the number of bits per value
+        :return: bytearray, the values packed, over bits * ceil(len(values) / 8) bytes
+        """
+        output = bytearray()
+        if bits == 0:
+            return output
+        for group_start in range(0, len(values), 8):
+            group = 0
+            group_values = values[group_start:group_start + 8]
+            for value in group_values:
+                group = (group << bits) | value
+            group <<= bits * (8 - len(group_values))
+            output += group.to_bytes(bits, 'big')
+        return output
+
+    @classmethod
+    def _unpack(cls, bin_list, offset, count, bits):
+        """
+        Unpack count values packed by <_pack>
+        :param bin_list: bytearray, the binary representation containing the packed values
+        :param offset: integer, the index of the first byte of the packed values
+        :param count: integer, the number of values to unpack
+        :param bits: integer, the number of bits per value
+        :return: a tuple (values, offset), where values is a list of integer and offset the index of the first byte
+                 following the packed values
+        """
+        if bits == 0:
+            return [0] * count, offset
+        values = []
+        mask = (1 << bits) - 1
+        shifts = [bits * (7 - index) for index in range(8)]
+        for group_start in range(0, count, 8):
+            group = int.from_bytes(bin_list[offset:offset + bits], 'big')
+            offset += bits
+            values.extend((group >> shift) & mask for shift in shifts[:count - group_start])
+        return values, offset
+
+    @classmethod
+    def _encode_fixed(cls, map_content):
+        """
+        Encode a posting list with the codec FIXED
+        :param map_content: list, list of tuples (docid, score) sorted by docid
+        :return: bytearray, the list encoded
+        """
+        output = bytearray()
+        for (doc_id, score) in map_content:
+            output += cls._encode_doc_id(doc_id)
+            output += cls._encode_score(score)
+        return output
+
+    @classmethod
+    def _encode_varint(cls, map_content):
+        """
+        Encode a posting list with the codec VARINT
+        :param map_content: list, list of tuples (docid, score) sorted by docid
+        :return: bytearray, the list encoded
+        """
+        output = bytearray()
+        last_id_encoded = 0
+        for (doc_id, score) in map_content:
+            output += cls._encode_number_variable_size(doc_id - last_id_encoded)
+            output += cls._encode_number_variable_size(score)
+            last_id_encoded = doc_id
+        return output
+
+    @classmethod
+    def _encode_bitpacked(cls, map_content):
+        """
+        Encode a non empty posting list with the codec BITPACKED
+        :param map_content: list, list of tuples (docid, score) sorted by docid
+        :return: bytearray, the list encoded
+        """
+        doc_ids = [doc_id for doc_id, _ in map_content]
+        scores = [score for _, score in map_content]
+        gaps = [doc_ids[index] - doc_ids[index - 1] for index in range(1, len(doc_ids))]
+        min_score = min(scores)
+        scores = [score - min_score for score in scores]
+        gap_bits = max(gaps).bit_length() if gaps else 0
+        score_bits = max(scores).bit_length()
+
+        output = cls._encode_number_variable_size(len(doc_ids))
+        output += cls._encode_number_variable_size(doc_ids[0])
+        output += cls._encode_number_variable_size(min_score)
+        output += cls._encode_number(gap_bits, 1) + cls._encode_number(score_bits, 1)
+        output += cls._pack(gaps, gap_bits)
+        output += cls._pack(scores, score_bits)
+        return output
+
+    @classmethod
+    def _encode_bitmap(cls, map_content):
+        """
+        Encode a non empty posting list with the codec BITMAP
+        :param map_content: list, list of tuples (docid, score) sorted by docid
+        :return: bytearray, the list encoded
+        """
+        doc_ids = [doc_id for doc_id, _ in map_content]
+        scores = [score for _, score in map_content]
+        range_len = doc_ids[-1] - doc_ids[0] + 1
+        min_score = min(scores)
+        scores = [score - min_score for score in scores]
+        score_bits = max(scores).bit_length()
+
+        bitmap = bytearray((range_len + 7) // 8)
+        for doc_id in doc_ids:
+            bit = doc_id - doc_ids[0]
+            bitmap[bit >> 3] |= 0x80 >> (bit & 7)
+
+        output = cls._encode_number_variable_size(len(doc_ids))
+        output += cls._encode_number_variable_size(doc_ids[0])
+        output += cls._encode_number_variable_size(range_len)
+        output += cls._encode_number_variable_size(min_score)
+        output += cls._encode_number(score_bits, 1)
+        output += bitmap
+        output += cls._pack(scores, score_bits)
+        return output
+
+    @classmethod
+    def _encode_roaring(cls, map_content):
+        """
+        Encode a posting list with the codec ROARING
+        :param map_content: list, list of tuples (docid, score) sorted by docid
+        :return: bytearray, the list encoded
+        """
+        if isinstance(map_content, BitmapPostingList):
+            return map_content.encode()
+        return BitmapPostingList.from_posting_list(map_content).encode()
+
+    @classmethod
+    def is_dense(cls, map_content, dense_threshold=None):
+        """
+        :param map_content: list, list of tuples (docid, score) sorted by docid
+        :param dense_threshold: float, overrides the class attribute dense_threshold if given
+        :return: boolean, whether the posting list is dense enough to be encoded with ROARING
+        """
+        if dense_threshold is None:
+            dense_threshold = cls.dense_threshold
+        if dense_threshold is None or len(map_content) < cls.dense_min_len:
+            return False
+        range_len = map_content[-1][0] - map_content[0][0] + 1
+        return len(map_content) >= dense_threshold * range_len
+
+    @classmethod
+    def _encode_with_codec(cls, map_content, codec):
+        """
+        :param map_content: list, list of tuples (docid, score) sorted by docid
+        :param codec: integer, one of FIXED, VARINT, BITPACKED, BITMAP and ROARING
+        :return: bytearray, <codec(1 byte)><encoded list>
+        """
+        encoders = {
+            cls.FIXED: cls._encode_fixed,
+            cls.VARINT: cls._encode_varint,
+            cls.BITPACKED: cls._encode_bitpacked,
+            cls.BITMAP: cls._encode_bitmap,
+            cls.ROARING: cls._encode_roaring,
+        }
+        output = cls._encode_number(codec, 1)
+        if len(map_content) > 0:
+            output += encoders[codec](map_content)
+        return output
+
+    @classmethod
+    def _encode_list(cls, map_content, dense_threshold=None):
+        """
+        Encode a list of (integer docid, integer score) with ROARING if it is dense, otherwise with every codec, keeping
+        the smallest encoding, in the format :
+        <list_len(list_len_len bytes)><codec(1 byte)><encoded list>
+        :param map_content : list, list of tuples (docid, score) where:
+                - docid : integer, id of an article
+                - score : integer, score of an article relative to some word
+        :param dense_threshold: float, overrides the class attribute dense_threshold if given
+        :return: bytearray, the list encoded
+        """
+        if not isinstance(map_content, BitmapPostingList):
+            map_content = list(map_content)
+        if cls.is_dense(map_content, dense_threshold):
+            output = cls._encode_with_codec(map_content, cls.ROARING)
+            return cls._encode_number(len(output), cls.list_len_len) + output
+
+        map_content = list(map_content)
+        output = None
+        for codec in cls.codecs:
+            if codec == cls.BITMAP and output is not None and len(map_content) > 0:
+                # the bitmap alone would be longer than the best encoding found, do not build it
+                if (map_content[-1][0] - map_content[0][0] + 8) // 8 >= len(output):
+                    continue
+            encoded = cls._encode_with_codec(map_content, codec)
+            if output is None or len(encoded) < len(output):
+                output = encoded
+        list_len = cls._encode_number(len(output), cls.list_len_len)
+        return list_len + output
+
+    @classmethod
+    def encode_posting_list(cls, key, map_content, dense_threshold=None):
+        """
+        Encode a pair (key, value) in binary, in the format :
+        <key_size(key_len_len bytes)><key(key_size bytes)><list_len(list_len_len bytes)><codec(1 byte)><encoded list>
+        :param key : string, a word, key of the map representing the index
+        :param map_content : list, list of tuples (docid, score) where:
+                - docid : integer, id of an article
+                - score : integer, score of an article relative to some word
+        :param dense_threshold: float, overrides the class attribute dense_threshold if given
+        :return: bytearray, the pair encoded
+        """
+        return cls._encode_key(key) + cls._encode_list(map_content, dense_threshold)
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#--------------------------------------------------------ADAPTIVE DECODING---------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    @classmethod
+    def codec_of(cls, bin_list):
+        """
+        :param bin_list: bytearray, the binary representation of a posting list
+        :return: integer, the codec the posting list is encoded with
+        """
+        return bin_list[0]
+
+    @classmethod
+    def _decode_fixed(cls, bin_list, offset):
+        """
+        Decode a posting list encoded with the codec FIXED
+        :param bin_list: bytearray, the binary representation of a posting list
+        :param offset: integer, the index of the first byte following the codec
+        :return: list, a list of tuples (doc_id, score)
+        """
+        output = []
+        article_len = cls.id_len + cls.score_len
+        for start in range(offset, len(bin_list) - article_len + 1, article_len):
+            middle = start + cls.id_len
+            output.append((int.from_bytes(bin_list[start:middle], 'big'),
+                           int.from_bytes(bin_list[middle:start + article_len], 'big')))
+        return output
+
+    @classmethod
+    def _decode_varint(cls, bin_list, offset):
+        """
+        Decode a posting list encoded with the codec VARINT
+        :param bin_list: bytearray, the binary representation of a posting list
+        :param offset: integer, the index of the first byte following the codec
+        :return: list, a list of tuples (doc_id, score)
+        """
+        return cls._decode_varint_block(bin_list, offset, len(bin_list), 0)[0]
+
+    @classmethod
+    def _decode_varint_block(cls, bin_list, offset, count, doc_id):
+        """
+        Decode a part of a posting list encoded with the codec VARINT
+        :param bin_list: bytes-like, the binary representation of a posting list
+        :param offset: integer, the index of the first byte to decode
+        :param count: integer, the maximum number of postings to decode
+        :param doc_id: integer, the last doc_id decoded before offset (0 at the beginning of the list)
+        :return: a tuple (postings, offset), where postings is a list of tuples (doc_id, score) and offset the index of
+                 the first byte following them
+        """
+        output = []
+        list_len = len(bin_list)
+        while offset < list_len and len(output) < count:
+            delta_doc_id, offset = cls._decode_number_variable_size_at(bin_list, offset)
+            score, offset = cls._decode_number_variable_size_at(bin_list, offset)
+            doc_id += delta_doc_id
+            output.append((doc_id, score))
+        return output, offset
+
+    @classmethod
+    def _decode_bitpacked(cls, bin_list, offset):
+        """
+        Decode a posting list encoded with the codec BITPACKED
+        :param bin_list: bytearray, the binary representation of a posting list
+        :param offset: integer, the index of the first byte following the codec
+        :return: list, a list of tuples (doc_id, score)
+        """
+        count, offset = cls._decode_number_variable_size_at(bin_list, offset)
+        doc_id, offset = cls._decode_number_variable_size_at(bin_list, offset)
+        min_score, offset = cls._decode_number_variable_size_at(bin_list, offset)
+        gap_bits, score_bits = bin_list[offset], bin_list[offset + 1]
+        gaps, offset = cls._unpack(bin_list, offset + 2, count - 1, gap_bits)
+        scores, _ = cls._unpack(bin_list, offset, count, score_bits)
+
+        doc_ids = [doc_id]
+        for gap in gaps:
+            doc_id += gap
+            doc_ids.append(doc_id)
+        return [(doc_id, score + min_score) for doc_id, score in zip(doc_ids, scores)]
+
+    @classmethod
+    def _decode_bitmap(cls, bin_list, offset):
+        """
+        Decode a posting list encoded with the codec BITMAP
+        :param bin_list: bytearray, the binary representation of a posting list
+        :param offset: integer, the index of the first byte following the codec
+        :return: list, a list of tuples (doc_id, score)
+        """
+        count, offset = cls._decode_number_variable_size_at(bin_list, offset)
+        first_doc_id, offset = cls._decode_number_variable_size_at(bin_list, offset)
+        range_len, offset = cls._decode_number_variable_size_at(bin_list, offset)
+        min_score, offset = cls._decode_number_variable_size_at(bin_list, offset)
+        score_bits = bin_list[offset]
+        offset += 1
+        bitmap_len = (range_len + 7) // 8
+
+        doc_ids = []
+        for byte_index in range(bitmap_len):
+            byte = bin_list[offset + byte_index]
+            while byte:
+                high_bit = byte.bit_length() - 1
+                byte ^= 1 << high_bit
+                doc_ids.append(first_doc_id + byte_index * 8 + 7 - high_bit)
+        scores, _ = cls._unpack(bin_list, offset + bitmap_len, count, score_bits)
+        return [(doc_id, score + min_score) for doc_id, score in zip(doc_ids, scores)]
+
+    @classmethod
+    def decode_list(cls, bin_list):
+        """
+        Decode an entire binary posting list of shape : <codec(1 byte)><encoded list>
+        :param bin_list: bytearray, the binary representation of a posting list
+        :return: list, a list of tuples (doc_id, score) where each :
+            - doc_id : integer, the unique id of an paper article
+            - score : integer, the score of this article relative to the keyword of this posting list
+                 A BitmapPostingList, which behaves as such a list, if the codec is ROARING
+        """
+        if len(bin_list) <= 1:
+            return []
+        if cls.codec_of(bin_list) == cls.ROARING:
+            return BitmapPostingList.decode(bin_list, 1)
+        decoders = {
+            cls.FIXED: cls._decode_fixed,
+            cls.VARINT: cls._decode_varint,
+            cls.BITPACKED: cls._decode_bitpacked,
+            cls.BITMAP: cls._decode_bitmap,
+        }
+        return decoders[cls.codec_of(bin_list)](bin_list, 1)
+
+    @classmethod
+    def cursor(cls, bin_list, cost=None):
+        """
+        Open a cursor on a binary posting list. The lists encoded with FIXED and VARINT are decoded as they are
+        visited, the other ones (compact by nature) are decoded at once.
+        :param bin_list: bytes-like, the binary representation of a posting list
+        :param cost: integer, the number of postings if known
+        :return: PostingCursor, positioned on the first posting
+        """
+        if len(bin_list) > 1 and cls.codec_of(bin_list) == cls.FIXED:
+            return FixedWidthPostingCursor(bin_list, cls.id_len, cls.score_len, 1)
+        if len(bin_list) > 1 and cls.codec_of(bin_list) == cls.VARINT:
+            return VarintPostingCursor(bin_list, cls._decode_varint_block, 1, cost)
+        return ListPostingCursor(cls.decode_list(bin_list))
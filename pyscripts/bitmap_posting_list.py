@@ -0,0 +1,295 @@
+import numpy as np
+
+from pyscripts.smart_disc_interfacer import SmartDiscInterfacer as sdi
+
+
+class BitmapPostingList(object):
+    """
+    Class made to represent a dense posting list as a compressed bitmap, Roaring style : the doc_ids are split by their
+    16 strongest bits (the key of a container) and the 16 weakest bits of the doc_ids sharing a key are saved in a
+    container, either a sorted array of uint16 when the container is sparse, or a bitmap of 2**16 bits (1024 uint64
+    words) when it holds more than array_max_len doc_ids. The scores are saved in a separate column, in the order of
+    the doc_ids.
+    It can be used as a posting list (a sequence of tuples (doc_id, score) sorted by doc_id), and intersected with
+    another posting list with vectorized operations (see <intersect>).
+    Initialize :
+        - keys : numpy array of int64, the sorted keys of the containers
+        - containers : list of numpy arrays, the ith one holding the weakest bits of the doc_ids of key keys[i], either
+          as an array of uint16 or as a bitmap of 1024 uint64
+        - scores : numpy array, the scores of the doc_ids, in order
+
+    Class Attributes :
+        - array_max_len : integer, the maximal number of doc_ids of a container saved as an array
+    """
+
+    array_max_len = 4096
+
+    def __init__(self, keys, containers, scores):
+        self.__keys = keys
+        self.__containers = containers
+        self.__scores = scores
+        self.__starts = np.zeros(len(containers) + 1, dtype=np.int64)
+        for index, container in enumerate(containers):
+            self.__starts[index + 1] = self.__starts[index] + self.__cardinality(container)
+        self.__counts = {}
+        self.__doc_ids = None
+
+    @classmethod
+    def from_posting_list(cls, posting_list):
+        """
+        :param posting_list: list, list of tuples (doc_id, score) sorted by doc_id
+        :return: BitmapPostingList, holding the same postings
+        """
+        doc_ids = np.array([doc_id for doc_id, _ in posting_list], dtype=np.int64)
+        scores = np.array([score for _, score in posting_list])
+        highs = doc_ids >> 16
+        keys, starts = np.unique(highs, return_index=True)
+        bounds = list(starts) + [len(doc_ids)]
+        containers = []
+        for index in range(len(keys)):
+            lows = (doc_ids[bounds[index]:bounds[index + 1]] & 0xFFFF).astype(np.uint16)
+            containers.append(cls.__to_container(lows))
+        return cls(keys.astype(np.int64), containers, scores)
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------CONTAINERS-----------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    @staticmethod
+    def __is_bitmap(container):
+        return container.dtype == np.uint64
+
+    @classmethod
+    def __bits_of(cls, words):
+        """
+        :param words: numpy array of uint64
+        :return: numpy array of bool of shape (len(words), 64), the bit j of the word i being at [i, j]
+        """
+        return ((words[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)).astype(bool)
+
+    @classmethod
+    def __to_container(cls, lows):
+        """
+        :param lows: numpy array of uint16, sorted
+        :return: numpy array, the container holding lows, as an array or a bitmap depending on its cardinality
+        """
+        if len(lows) <= cls.array_max_len:
+            return lows
+        words = np.zeros(1024, dtype=np.uint64)
+        np.bitwise_or.at(words, (lows >> 6).astype(np.int64), np.uint64(1) << (lows & 63).astype(np.uint64))
+        return words
+
+    @classmethod
+    def __lows_of(cls, container):
+        """
+        :param container: numpy array, a container
+        :return: numpy array of uint16, the sorted weakest bits of the doc_ids of the container
+        """
+        if not cls.__is_bitmap(container):
+            return container
+        return np.flatnonzero(cls.__bits_of(container)).astype(np.uint16)
+
+    @classmethod
+    def __cardinality(cls, container):
+        if not cls.__is_bitmap(container):
+            return len(container)
+        return int(cls.__bits_of(container).sum())
+
+    @classmethod
+    def __contains(cls, container, lows):
+        """
+        Probe a container
+        :param container: numpy array, a container
+        :param lows: numpy array of uint16, the weakest bits of doc_ids
+        :return: numpy array of bool, whether each of lows is in the container
+        """
+        if cls.__is_bitmap(container):
+            words = container[(lows >> 6).astype(np.int64)]
+            return ((words >> (lows & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+        indexes = np.searchsorted(container, lows)
+        found = indexes < len(container)
+        found[found] = container[indexes[found]] == lows[found]
+        return found
+
+    def __rank(self, container_index, lows):
+        """
+        :param container_index: integer, the index of a container
+        :param lows: numpy array of uint16, weakest bits of doc_ids which are all in the container
+        :return: numpy array of int64, the indexes of the doc_ids in the whole posting list
+        """
+        container = self.__containers[container_index]
+        if not self.__is_bitmap(container):
+            return self.__starts[container_index] + np.searchsorted(container, lows)
+        if container_index not in self.__counts:
+            # number of doc_ids of the container lower or equal to each of the 2**16 possible weakest bits
+            self.__counts[container_index] = np.cumsum(self.__bits_of(container).ravel())
+        return self.__starts[container_index] + self.__counts[container_index][lows.astype(np.int64)] - 1
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-----------------------------------------------------------POSTING LIST-----------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    def doc_ids(self):
+        """
+        :return: numpy array of int64, the sorted doc_ids of the posting list
+        """
+        if self.__doc_ids is None:
+            parts = [(int(key) << 16) + self.__lows_of(container).astype(np.int64)
+                     for key, container in zip(self.__keys, self.__containers)]
+            self.__doc_ids = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        return self.__doc_ids
+
+    def scores(self):
+        """
+        :return: numpy array, the scores of the posting list, in the order of the doc_ids
+        """
+        return self.__scores
+
+    def with_scores(self, scores):
+        """
+        :param scores: numpy array, new scores, in the order of the doc_ids
+        :return: BitmapPostingList, holding the same doc_ids as this one with the given scores
+        """
+        return BitmapPostingList(self.__keys, self.__containers, scores)
+
+    def __len__(self):
+        return int(self.__starts[-1])
+
+    def __getitem__(self, index):
+        return int(self.doc_ids()[index]), self.__scores[index].item()
+
+    def __iter__(self):
+        return iter(zip(self.doc_ids().tolist(), self.__scores.tolist()))
+
+    def top(self, top_k):
+        """
+        :param top_k: integer, the maximum number of postings returned
+        :return: list of tuples (doc_id, score), the top_k postings of highest score, sorted by score (the postings of
+                 same score are sorted by doc_id)
+        """
+        indexes = np.argsort(-self.__scores, kind='mergesort')[:top_k]
+        return list(zip(self.doc_ids()[indexes].tolist(), self.__scores[indexes].tolist()))
+
+    def intersect(self, other, score_function):
+        """
+        Intersect this posting list with another one.
+        If the other one is a BitmapPostingList, the containers of same key are intersected with a word-level AND when
+        both are bitmaps, by probing when one of them is an array, and the result is a BitmapPostingList.
+        Otherwise, the doc_ids of the other posting list are probed in this one, and the result is a list.
+        :param other: BitmapPostingList or list of tuples (doc_id, score) sorted by doc_id
+        :param score_function: function of prototype [score function(score_1, score_2)], combining the score of a
+                               document in this posting list and in the other one. It must accept numpy arrays
+        :return: the postings of the documents in both posting lists, with their combined score
+        """
+        if isinstance(other, BitmapPostingList):
+            return self.__intersect_bitmap(other, score_function)
+
+        doc_ids = np.array([doc_id for doc_id, _ in other], dtype=np.int64)
+        other_scores = np.array([score for _, score in other])
+        found = np.zeros(len(doc_ids), dtype=bool)
+        scores = np.zeros(len(doc_ids), dtype=self.__scores.dtype)
+        highs = doc_ids >> 16
+        for key in np.intersect1d(self.__keys, highs):
+            key_index = int(np.searchsorted(self.__keys, key))
+            in_container = highs == key
+            lows = (doc_ids[in_container] & 0xFFFF).astype(np.uint16)
+            contained = self.__contains(self.__containers[key_index], lows)
+            positions = np.flatnonzero(in_container)[contained]
+            found[positions] = True
+            scores[positions] = self.__scores[self.__rank(key_index, lows[contained])]
+        combined = score_function(scores[found], other_scores[found])
+        return list(zip(doc_ids[found].tolist(), combined.tolist()))
+
+    def __intersect_bitmap(self, other, score_function):
+        """
+        :param other: BitmapPostingList
+        :param score_function: see <intersect>
+        :return: BitmapPostingList, the intersection of both posting lists
+        """
+        common_keys = np.intersect1d(self.__keys, other.__keys)
+        self_indexes = np.searchsorted(self.__keys, common_keys)
+        other_indexes = np.searchsorted(other.__keys, common_keys)
+
+        keys = []
+        containers = []
+        scores = []
+        for key, self_index, other_index in zip(common_keys, self_indexes, other_indexes):
+            self_container = self.__containers[self_index]
+            other_container = other.__containers[other_index]
+            if self.__is_bitmap(self_container) and self.__is_bitmap(other_container):
+                words = self_container & other_container
+                lows = self.__lows_of(words)
+                container = words if len(lows) > self.array_max_len else lows
+            elif not self.__is_bitmap(self_container):
+                lows = self_container[self.__contains(other_container, self_container)]
+                container = lows
+            else:
+                lows = other_container[self.__contains(self_container, other_container)]
+                container = lows
+            if len(lows) == 0:
+                continue
+            keys.append(key)
+            containers.append(container)
+            scores.append(score_function(self.__scores[self.__rank(self_index, lows)],
+                                         other.__scores[other.__rank(other_index, lows)]))
+
+        return BitmapPostingList(np.array(keys, dtype=np.int64), containers,
+                                 np.concatenate(scores) if scores else np.zeros(0, dtype=self.__scores.dtype))
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-----------------------------------------------------------ENCODING---------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    def encode(self):
+        """
+        Encode the posting list in binary, in the format :
+        <container_count (variable length)>
+        ( <key (variable length)><is_bitmap(1 byte)><cardinality (variable length)><container> )*container_count
+        <score_len(1 byte)><scores (score_len bytes each, little endian)>
+        where a container is either an array of cardinality uint16 or a bitmap of 1024 uint64, little endian
+        :return: bytearray, the posting list encoded
+        """
+        output = sdi._encode_number_variable_size(len(self.__containers))
+        for key, container in zip(self.__keys, self.__containers):
+            output += sdi._encode_number_variable_size(int(key))
+            output += bytearray([int(self.__is_bitmap(container))])
+            output += sdi._encode_number_variable_size(self.__cardinality(container))
+            output += container.astype(container.dtype.newbyteorder('<')).tobytes()
+
+        max_score = int(self.__scores.max()) if len(self.__scores) > 0 else 0
+        score_len = next(size for size in (1, 2, 4, 8) if max_score < 2 ** (8 * size))
+        output += bytearray([score_len])
+        output += self.__scores.astype('<u{}'.format(score_len)).tobytes()
+        return output
+
+    @classmethod
+    def decode(cls, bin_list, offset=0):
+        """
+        Decode a posting list encoded by <encode>
+        :param bin_list: bytearray, the binary representation containing the posting list
+        :param offset: integer, the index of the first byte of the posting list
+        :return: BitmapPostingList, the posting list decoded
+        """
+        container_count, offset = sdi._decode_number_variable_size_at(bin_list, offset)
+        keys = []
+        containers = []
+        count = 0
+        for _ in range(container_count):
+            key, offset = sdi._decode_number_variable_size_at(bin_list, offset)
+            is_bitmap = bin_list[offset]
+            cardinality, offset = sdi._decode_number_variable_size_at(bin_list, offset + 1)
+            if is_bitmap:
+                container = np.frombuffer(bytes(bin_list[offset:offset + 8192]), dtype='<u8').astype(np.uint64)
+                offset += 8192
+            else:
+                container = np.frombuffer(bytes(bin_list[offset:offset + 2 * cardinality]), dtype='<u2')
+                container = container.astype(np.uint16)
+                offset += 2 * cardinality
+            keys.append(key)
+            containers.append(container)
+            count += cardinality
+
+        score_len = bin_list[offset]
+        offset += 1
+        scores = np.frombuffer(bytes(bin_list[offset:offset + score_len * count]), dtype='<u{}'.format(score_len))
+        return cls(np.array(keys, dtype=np.int64), containers, scores.astype(np.int64))
@@ -0,0 +1,181 @@
+import datetime
+
+from pyscripts.formatted_document import FormattedDocument
+from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer as ndi
+from pyscripts.posting_cursor import RangePostingCursor
+
+
+class DateIndex(object):
+    """
+    Class made to record the day each document of an inverted file was written, so that a query can be restricted to a
+    range of dates before any document is scored. For each day, the doc_ids of its documents are kept as sorted ranges
+    of consecutive doc_ids : the documents of a day usually have consecutive DOCIDs, and always do once the doc_ids
+    are reassigned by date (see DocIdMap), so a range of dates is a handful of ranges of doc_ids.
+    The date index is saved next to the inverted file (see InvertedFile.dates_filename), shaped as :
+    ( <day(day_len bytes)><range_count(count_len bytes)>
+      ( <first doc_id(id_len bytes)><last doc_id(id_len bytes)> )*range_count )*N
+    sorted by day, where day is the proleptic Gregorian ordinal of the date.
+
+    Attributes :
+        - __days : dictionary (key: integer, value: list), the ranges (first doc_id, last doc_id) of the documents of
+          each day, by ordinal
+
+    Class Attributes :
+        - day_len : integer, the number of bytes used to encode a day
+        - count_len : integer, the number of bytes used to encode the number of ranges of a day
+        - id_len : integer, the number of bytes used to encode a doc_id
+    """
+
+    day_len = 4
+    count_len = 4
+    id_len = ndi.id_len
+
+    def __init__(self):
+        self.__days = {}
+
+    def __len__(self):
+        return len(self.__days)
+
+    def add(self, doc_id, date):
+        """
+        Record the day a document was written
+        :param doc_id: integer, the id of the document
+        :param date: datetime.date, the day the document was written
+        :return: None
+        """
+        ranges = self.__days.setdefault(date.toordinal(), [])
+        if ranges and ranges[-1][1] + 1 == doc_id:
+            ranges[-1] = (ranges[-1][0], doc_id)
+        else:
+            ranges.append((doc_id, doc_id))
+
+    def add_document(self, document):
+        """
+        Record the day an article was written, if its date can be read (see FormattedDocument.parse_date)
+        :param document: dictionary, an element of the list <FormattedDocument.matches>
+        :return: None
+        """
+        date = FormattedDocument.parse_date(document['date'])
+        if date is not None:
+            self.add(document['id'], date)
+
+    def items(self):
+        """
+        :return: list of tuples (date, doc_ids) sorted by date, where date is a datetime.date and doc_ids is the
+                 sorted list of the ids of the documents written that day
+        """
+        return [(datetime.date.fromordinal(day), [doc_id for first, last in self.__coalesce(self.__days[day])
+                                                  for doc_id in range(first, last + 1)])
+                for day in sorted(self.__days)]
+
+    def ranges(self, start=None, end=None):
+        """
+        :param start: datetime.date, the first day of the range of dates, None for no lower bound. Default is None
+        :param end: datetime.date, the last day of the range of dates (included), None for no upper bound.
+                    Default is None
+        :return: list of tuples (first doc_id, last doc_id), sorted and disjoint, the ranges of the doc_ids of the
+                 documents written between start and end
+        """
+        start = start.toordinal() if start is not None else None
+        end = end.toordinal() if end is not None else None
+        return self.__coalesce([doc_range for day, ranges in self.__days.items()
+                                if (start is None or day >= start) and (end is None or day <= end)
+                                for doc_range in ranges])
+
+    def cursor(self, start=None, end=None):
+        """
+        :param start: see <ranges>
+        :param end: see <ranges>
+        :return: RangePostingCursor, walking through the doc_ids of the documents written between start and end
+        """
+        return RangePostingCursor(self.ranges(start, end))
+
+    @staticmethod
+    def __coalesce(ranges):
+        """
+        :param ranges: list of tuples (first doc_id, last doc_id)
+        :return: list of tuples (first doc_id, last doc_id), the same doc_ids as sorted and disjoint ranges, the
+                 consecutive ranges being joined
+        """
+        output = []
+        for first, last in sorted(ranges):
+            if output and first <= output[-1][1] + 1:
+                output[-1] = (output[-1][0], max(last, output[-1][1]))
+            else:
+                output.append((first, last))
+        return output
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------MERGE AND REMAP------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    @classmethod
+    def merge(cls, date_index_1, date_index_2):
+        """
+        :param date_index_1: DateIndex, the date index of an inverted file
+        :param date_index_2: DateIndex, the date index of another inverted file
+        :return: DateIndex, the date index of the merge of both inverted files
+        """
+        output = cls()
+        for date_index in (date_index_1, date_index_2):
+            for day, ranges in date_index.__days.items():
+                output.__days.setdefault(day, []).extend(ranges)
+        for day, ranges in output.__days.items():
+            output.__days[day] = cls.__coalesce(ranges)
+        return output
+
+    def remap(self, doc_id_map):
+        """
+        :param doc_id_map: DocIdMap, the internal id of every document of the date index
+        :return: DateIndex, the same dates with the internal ids of the documents
+        """
+        output = DateIndex()
+        for date, doc_ids in self.items():
+            for doc_id in sorted(doc_id_map.internal(doc_id) for doc_id in doc_ids):
+                output.add(doc_id, date)
+        return output
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------SAVE AND LOAD--------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    def save(self, filename):
+        """
+        Save the date index to the disc
+        :param filename: string, the path of the file, typically InvertedFile.dates_filename of the inverted file
+        :return: None
+        """
+        output = bytearray()
+        for day in sorted(self.__days):
+            ranges = self.__coalesce(self.__days[day])
+            output += ndi._encode_number(day, self.day_len)
+            output += ndi._encode_number(len(ranges), self.count_len)
+            for first, last in ranges:
+                output += ndi._encode_number(first, self.id_len)
+                output += ndi._encode_number(last, self.id_len)
+        with open(filename, 'wb+') as f:
+            f.write(output)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        :param filename: string, the path of a file written by <save>
+        :return: DateIndex, the date index saved in the file
+        """
+        with open(filename, 'rb') as f:
+            content = f.read()
+        output = cls()
+        position = 0
+        while position < len(content):
+            day = ndi.decode_number(content[position:position + cls.day_len])
+            position += cls.day_len
+            range_count = ndi.decode_number(content[position:position + cls.count_len])
+            position += cls.count_len
+            ranges = []
+            for _ in range(range_count):
+                first = ndi.decode_number(content[position:position + cls.id_len])
+                last = ndi.decode_number(content[position + cls.id_len:position + 2 * cls.id_len])
+                ranges.append((first, last))
+                position += 2 * cls.id_len
+            output.__days[day] = ranges
+        return output
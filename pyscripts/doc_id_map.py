@@ -0,0 +1,144 @@
+import datetime
+import re
+import zlib
+
+import numpy as np
+
+from pyscripts.document_store import DocumentStoreReader
+from pyscripts.formatted_document import FormattedDocument
+from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer as ndi
+
+
+class DocIdMap(object):
+    """
+    Class made to reassign the doc_ids of an inverted file : the documents are given dense internal ids, 1 to N, in an
+    order putting similar documents next to each other, so that the gaps between the doc_ids of a posting list are
+    small (better delta compression) and the documents matched by a query are close to each other (better locality of
+    the intersections). The map from the internal ids to the original DOCIDs is saved next to the inverted file (see
+    InvertedFile.ids_filename), shaped as :
+    <doc_count(count_len bytes)>( <external doc_id(id_len bytes)> )*doc_count, the ith one being the DOCID of the
+    document of internal id i.
+    Initialize :
+        - external_ids : list of integer, the ith element being the DOCID of the document of internal id i + 1
+
+    Attributes :
+        - __external_ids : the external_ids sent in parameter for __init__
+        - __internal_ids : dictionary (key: integer, value: integer), the internal id of each DOCID, built when first
+          needed
+
+    Class Attributes :
+        - count_len : integer, the number of bytes used to encode the number of documents
+        - id_len : integer, the number of bytes used to encode a DOCID
+        - signature_size : integer, the number of min-hashes of a headline used to order the documents of a same day
+    """
+
+    count_len = 4
+    id_len = ndi.id_len
+    signature_size = 2
+
+    def __init__(self, external_ids):
+        self.__external_ids = list(external_ids)
+        self.__internal_ids = None
+
+    def __len__(self):
+        return len(self.__external_ids)
+
+    def internal(self, external_id):
+        """
+        :param external_id: integer, a DOCID
+        :return: integer, the internal id of the document
+        :raise KeyError: if the document is not in the map
+        """
+        if self.__internal_ids is None:
+            self.__internal_ids = {doc_id: index + 1 for index, doc_id in enumerate(self.__external_ids)}
+        return self.__internal_ids[int(external_id)]
+
+    def external(self, internal_id):
+        """
+        :param internal_id: integer, an internal id, between 1 and the number of documents
+        :return: integer, the DOCID of the document
+        """
+        return self.__external_ids[int(internal_id) - 1]
+
+    def externalize(self, results):
+        """
+        :param results: list of tuples (internal id, score), as computed on a remapped inverted file
+        :return: list of tuples (DOCID, score), in the same order
+        """
+        return [(self.external(doc_id), score) for doc_id, score in results]
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------ORDERING-------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    @classmethod
+    def order(cls, documents):
+        """
+        Build the map reassigning the doc_ids of some documents : they are sorted by date, then, within a day, by the
+        min-hashes of their headline, which puts the headlines sharing words next to each other (two headlines have
+        the same min-hash with a probability equal to their Jaccard similarity). The documents whose date can not be
+        read come last.
+        :param documents: iterable of dictionaries of shape (id, title, date, ...), as the elements of
+                          <FormattedDocument.matches> or the documents of a DocumentStoreReader
+        :return: DocIdMap, the internal id of every document
+        """
+        keys = []
+        for document in documents:
+            date = FormattedDocument.parse_date(document['date'])
+            keys.append((date or datetime.date.max, cls.__headline_signature(document['title']), document['id']))
+        return cls([doc_id for _, _, doc_id in sorted(keys)])
+
+    @classmethod
+    def from_document_store(cls, filename):
+        """
+        Build the map reassigning the doc_ids of the documents of a document store (see <order>)
+        :param filename: string, the path of the document store, typically InvertedFile.documents_filename of the
+                         inverted file to remap
+        :return: DocIdMap, the internal id of every document of the store
+        """
+        with DocumentStoreReader(filename) as reader:
+            doc_ids = [doc_id for doc_id, _ in reader.raw_records()]
+            return cls.order(reader.get(doc_id) for doc_id in doc_ids)
+
+    @classmethod
+    def __headline_signature(cls, title):
+        """
+        :param title: list of string, the tokenized headline of a document
+        :return: tuple of integer, the signature_size min-hashes of the words of the headline (the punctuation and the
+                 words of less than 3 letters being ignored), empty if there is no such word
+        """
+        words = {token.lower() for token in title if len(token) > 2 and re.match(r'\w', token)}
+        if not words:
+            return ()
+        return tuple(min(zlib.crc32(word.encode('utf-8'), seed) for word in words)
+                     for seed in range(cls.signature_size))
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------SAVE AND LOAD--------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    def save(self, filename):
+        """
+        Save the map to the disc
+        :param filename: string, the path of the file, typically InvertedFile.ids_filename of the remapped inverted file
+        :return: None
+        """
+        output = ndi._encode_number(len(self.__external_ids), self.count_len)
+        for doc_id in self.__external_ids:
+            output += ndi._encode_number(doc_id, self.id_len)
+        with open(filename, 'wb+') as f:
+            f.write(output)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        :param filename: string, the path of a file written by <save>
+        :return: DocIdMap, the map saved in the file
+        """
+        with open(filename, 'rb') as f:
+            content = f.read()
+        doc_count = ndi.decode_number(content[:cls.count_len])
+        # the big endian ids are decoded all at once, one column of bytes after the other
+        id_bytes = np.frombuffer(content, dtype=np.uint8, count=doc_count * cls.id_len, offset=cls.count_len)
+        shifts = np.arange(8 * (cls.id_len - 1), -1, -8, dtype=np.uint64)
+        return cls((id_bytes.reshape(doc_count, cls.id_len).astype(np.uint64) << shifts).sum(axis=1).tolist())
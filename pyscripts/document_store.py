@@ -0,0 +1,279 @@
+import collections
+import json
+import mmap
+import zlib
+
+from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer as ndi
+
+
+class DocumentStore(object):
+    """
+    Class made to collect the metadata of the documents while they are indexed, and to save them in a compact file
+    which can be read back without parsing the xml documents again (see DocumentStoreReader).
+    The file is shaped as :
+    <doc_count(count_len bytes)><has_text(1 byte)>
+    ( <doc_id(id_len bytes)><offset(offset_len bytes)> )*doc_count, sorted by doc_id
+    ( <title_len(field_len_len bytes)><title><date_len(field_len_len bytes)><date><length(length_len bytes)>
+      [<text_len(field_len_len bytes)><text>] )*doc_count
+    where title is the json of the tokenized title, date is utf-8 encoded and text is the json of the tokenized text,
+    compressed with zlib.
+    Initialize :
+        - store_text : boolean, whether the text of the documents must be saved too. Default is False
+
+    Class Attributes :
+        - count_len : integer, the number of bytes used to encode the number of documents
+        - id_len : integer, the number of bytes used to encode a doc_id
+        - offset_len : integer, the number of bytes used to encode the offset of a record in the file
+        - field_len_len : integer, the number of bytes used to encode the size of a field
+        - length_len : integer, the number of bytes used to encode the length of a document
+
+    Attributes :
+        - __records : dictionary (key: integer, value: bytearray), the encoded record of each document, by doc_id
+        - __store_text : boolean, whether the text of the documents is saved
+    """
+
+    count_len = 4
+    id_len = ndi.id_len
+    offset_len = 8
+    field_len_len = 4
+    length_len = 4
+
+    def __init__(self, store_text=False):
+        self.__records = {}
+        self.__store_text = store_text
+
+    def add_document(self, document):
+        """
+        Add the metadata of an article in the store.
+        :param document: dictionary, an element of the list <FormattedDocument.matches>, of shape
+                         (id, title, date, length, text)
+        :return: None
+        """
+        record = self.__encode_field(json.dumps(document['title']).encode('utf-8'))
+        record += self.__encode_field((document['date'] or '').encode('utf-8'))
+        record += ndi._encode_number(document['length'], self.length_len)
+        if self.__store_text:
+            record += self.__encode_field(zlib.compress(json.dumps(document['text']).encode('utf-8')))
+        self.__records[document['id']] = record
+
+    def save(self, filename):
+        """
+        Save the DocumentStore to the disc
+        :param filename: string, the path of the file to be saved on disc
+        :return: None
+        """
+        self.write_records(filename, sorted(self.__records.items()), self.__store_text)
+
+    @classmethod
+    def write_records(cls, filename, records, store_text):
+        """
+        Write already encoded records in a document store file
+        :param filename: string, the path of the file to be saved on disc
+        :param records: list of tuples (doc_id, record) sorted by doc_id, where record is a bytearray
+        :param store_text: boolean, whether the records hold the text of the documents
+        :return: None
+        """
+        output = ndi._encode_number(len(records), cls.count_len)
+        output += ndi._encode_number(int(store_text), 1)
+        offset = len(output) + len(records) * (cls.id_len + cls.offset_len)
+        for (doc_id, record) in records:
+            output += ndi._encode_number(doc_id, cls.id_len)
+            output += ndi._encode_number(offset, cls.offset_len)
+            offset += len(record)
+        for (_, record) in records:
+            output += record
+        with open(filename, 'wb+') as f:
+            f.write(output)
+
+    @classmethod
+    def merge_document_stores(cls, filename_merge, filename_ds1, filename_ds2):
+        """
+        Merge two document stores saved on disc into one, without decoding their records.
+        :param filename_merge: string, the path to the newly created document store
+        :param filename_ds1: string, the path to the first document store to merge
+        :param filename_ds2: string, the path to the second document store to merge
+        :return: None
+        """
+        with DocumentStoreReader(filename_ds1) as ds1, DocumentStoreReader(filename_ds2) as ds2:
+            records = dict(ds1.raw_records())
+            records.update(ds2.raw_records())
+            cls.write_records(filename_merge, sorted(records.items()), ds1.has_text and ds2.has_text)
+
+    @classmethod
+    def __encode_field(cls, bin_field):
+        """
+        :param bin_field: bytes, the field to encode
+        :return: bytearray, <field_len(field_len_len bytes)><field>
+        """
+        return ndi._encode_number(len(bin_field), cls.field_len_len) + bin_field
+
+
+class DocumentStoreReader(object):
+    """
+    Class made to read a file written by DocumentStore through a memory map, so that fetching a document only touches
+    the pages of the offset table and of its record.
+    Initialize :
+        - filename : string, the path of the document store
+        - cache_size : integer, the number of decoded documents kept in memory. Default is 128
+
+    Attributes :
+        - has_text : boolean, whether the records hold the text of the documents
+        - hits / misses : integer, the number of lookups answered with / without the cache
+        - __doc_count : integer, the number of documents in the store
+        - __cache : OrderedDict, the decoded documents, from the least to the most recently used
+    """
+
+    def __init__(self, filename, cache_size=128):
+        self.__file = open(filename, 'rb')
+        self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__doc_count = ndi.decode_number(self.__mmap[:DocumentStore.count_len])
+        self.has_text = self.__mmap[DocumentStore.count_len] == 1
+        self.__table_offset = DocumentStore.count_len + 1
+        self.__entry_len = DocumentStore.id_len + DocumentStore.offset_len
+        self.__cache = collections.OrderedDict()
+        self.__cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.__doc_count
+
+    def close(self):
+        """
+        Release the memory map and the file
+        :return: None
+        """
+        self.__mmap.close()
+        self.__file.close()
+
+    def __entry(self, index):
+        """
+        :param index: integer, the index of an entry of the offset table
+        :return: a tuple (doc_id, offset) where offset is the position of the record of doc_id in the file
+        """
+        start = self.__table_offset + index * self.__entry_len
+        middle = start + DocumentStore.id_len
+        return (ndi.decode_number(self.__mmap[start:middle]),
+                ndi.decode_number(self.__mmap[middle:middle + DocumentStore.offset_len]))
+
+    def __record_bounds(self, index):
+        """
+        :param index: integer, the index of an entry of the offset table
+        :return: a tuple (start, end), the position of the record in the file
+        """
+        _, start = self.__entry(index)
+        if index + 1 < self.__doc_count:
+            _, end = self.__entry(index + 1)
+        else:
+            end = len(self.__mmap)
+        return start, end
+
+    def __find(self, doc_id):
+        """
+        Binary search of a doc_id in the offset table
+        :param doc_id: integer, the id of a document
+        :return: integer, the index of its entry, None if the document is not in the store
+        """
+        min_index = 0
+        max_index = self.__doc_count
+        while min_index < max_index:
+            mid = (min_index + max_index) // 2
+            mid_doc_id, _ = self.__entry(mid)
+            if doc_id > mid_doc_id:
+                min_index = mid + 1
+            elif doc_id < mid_doc_id:
+                max_index = mid
+            else:
+                return mid
+        return None
+
+    def __decode_field(self, offset):
+        """
+        :param offset: integer, the position of a field encoded as <field_len(field_len_len bytes)><field>
+        :return: a tuple (field, offset) where field is bytes and offset the position following the field
+        """
+        start = offset + DocumentStore.field_len_len
+        end = start + ndi.decode_number(self.__mmap[offset:start])
+        return self.__mmap[start:end], end
+
+    def __decode_record(self, doc_id, offset):
+        """
+        :param doc_id: integer, the id of the document
+        :param offset: integer, the position of its record in the file
+        :return: dictionary, of shape (id, title, date, length[, text])
+        """
+        bin_title, offset = self.__decode_field(offset)
+        bin_date, offset = self.__decode_field(offset)
+        document = {
+            'id': doc_id,
+            'title': json.loads(bin_title.decode('utf-8')),
+            'date': bin_date.decode('utf-8') or None,
+            'length': ndi.decode_number(self.__mmap[offset:offset + DocumentStore.length_len]),
+        }
+        offset += DocumentStore.length_len
+        if self.has_text:
+            bin_text, _ = self.__decode_field(offset)
+            document['text'] = json.loads(zlib.decompress(bin_text).decode('utf-8'))
+        return document
+
+    def get(self, doc_id):
+        """
+        Fetch the stored fields of a document
+        :param doc_id: integer, the id of the document
+        :return: dictionary, of shape (id, title, date, length[, text]), None if the document is not in the store
+        """
+        return self.get_many([doc_id])[0]
+
+    def get_many(self, doc_ids):
+        """
+        Fetch the stored fields of several documents, typically the top-k results of a query.
+        The records are read in the order of the file to limit the number of pages touched.
+        :param doc_ids: list of integer, the ids of the documents
+        :return: list of dictionaries of shape (id, title, date, length[, text]), in the order of doc_ids.
+                 An element is None if its document is not in the store
+        """
+        found = {}
+        for doc_id in sorted(set(doc_ids)):
+            if doc_id in self.__cache:
+                self.hits += 1
+                self.__cache.move_to_end(doc_id)
+                found[doc_id] = self.__cache[doc_id]
+                continue
+
+            self.misses += 1
+            index = self.__find(doc_id)
+            if index is None:
+                found[doc_id] = None
+                continue
+            _, offset = self.__entry(index)
+            found[doc_id] = self.__decode_record(doc_id, offset)
+            self.__cache[doc_id] = found[doc_id]
+            if len(self.__cache) > self.__cache_size:
+                self.__cache.popitem(last=False)
+
+        return [found[doc_id] for doc_id in doc_ids]
+
+    def hydrate(self, results):
+        """
+        Attach the stored fields of the documents to the result of a query
+        :param results: list of tuples (doc_id, score), as returned by NaiveQuery.execute or FaginQuery.execute
+        :return: list of tuples (doc_id, score, document) where document is as returned by <get>
+        """
+        documents = self.get_many([doc_id for doc_id, _ in results])
+        return [(doc_id, score, document) for (doc_id, score), document in zip(results, documents)]
+
+    def raw_records(self):
+        """
+        Generator, yield the records of the store without decoding them
+        :return: yield tuples (doc_id, record) sorted by doc_id, where record is bytes
+        """
+        for index in range(self.__doc_count):
+            doc_id, _ = self.__entry(index)
+            start, end = self.__record_bounds(index)
+            yield doc_id, self.__mmap[start:end]
@@ -1,7 +1,11 @@
+import datetime
 import json
 import re
 import nltk
 
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october',
+          'november', 'december']
+
 
 class FormattedDocument(object):
     """
@@ -81,6 +85,23 @@ class FormattedDocument(object):
 
         return output
 
+    @staticmethod
+    def parse_date(date):
+        """
+        Read the day an article was written from its date field
+        parameters :
+            - date : string, the date field of an article, such as "January 1, 1989, Sunday, Home Edition", or None
+        return :
+            - a datetime.date, None if the date field is missing or can not be read
+        """
+        match = re.search(r'([A-Za-z]+)\s+(\d{1,2}),\s*(\d{4})', date or '')
+        if match is None or match.group(1).lower() not in MONTHS:
+            return None
+        try:
+            return datetime.date(int(match.group(3)), MONTHS.index(match.group(1).lower()) + 1, int(match.group(2)))
+        except ValueError:
+            return None
+
     def to_json(self):
         """
         Convert the object into a json string
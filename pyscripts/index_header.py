@@ -0,0 +1,161 @@
+import json
+import zlib
+
+from pyscripts.adaptive_disc_interfacer import AdaptiveDiscInterfacer as adi
+from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer as ndi
+from pyscripts.score_quantizer import ScoreQuantizer
+from pyscripts.smart_disc_interfacer import SmartDiscInterfacer as sdi
+
+
+class IndexFormatError(Exception):
+    """
+    Exception whose vocation is to be thrown when an inverted file can not be read : unknown version or format,
+    or content not matching its checksum
+    """
+    pass
+
+
+class IndexHeader(object):
+    """
+    Class made to represent the header written at the beginning of an inverted file, so that a reader knows how the
+    file has been encoded without being told. It is shaped as :
+    <magic(4 bytes)><version(1 byte)><header_len(4 bytes)><checksum(4 bytes)>
+    <id_len(1 byte)><score_len(1 byte)><list_len_len(1 byte)><key_len_len(1 byte)>
+    <format_len(1 byte)><format(format_len bytes)><options(json, up to header_len)>
+    Files written before the header existed start directly with a posting list, they are still readable with the
+    interfacer given by the caller.
+    Initialize :
+        - interfacer : class, the interfacer the inverted file is encoded with. Its format_name, id_len, score_len,
+          list_len_len and key_len_len are recorded
+        - checksum : integer, the crc32 of everything following the header
+        - options : dictionary, the options of the encoding that a reader needs to know. Default is empty
+
+    Class Attributes :
+        - magic : bytes, the first bytes of an inverted file with a header
+        - version : integer, the version of the header written
+        - formats : dictionary (key: string, value: class), the interfacers a header can refer to, by format_name
+    """
+
+    magic = b'TIDX'
+    version = 1
+    formats = {}
+
+    def __init__(self, interfacer, checksum=0, options=None):
+        self.format_name = interfacer.format_name
+        self.id_len = interfacer.id_len
+        self.score_len = interfacer.score_len
+        self.list_len_len = interfacer.list_len_len
+        self.key_len_len = interfacer.key_len_len
+        self.checksum = checksum
+        self.options = options if options is not None else {}
+
+    @classmethod
+    def register(cls, interfacer):
+        """
+        Allow a header to refer to an interfacer
+        :param interfacer: class, an interfacer with a format_name
+        :return: the interfacer, so that the method can be used as a class decorator
+        """
+        cls.formats[interfacer.format_name] = interfacer
+        return interfacer
+
+    def encode(self):
+        """
+        :return: bytearray, the header encoded
+        """
+        bin_format = bytearray(self.format_name, 'utf-8')
+        bin_options = bytearray(json.dumps(self.options, sort_keys=True), 'utf-8')
+        output = ndi._encode_number(self.checksum, 4)
+        for field_len in (self.id_len, self.score_len, self.list_len_len, self.key_len_len, len(bin_format)):
+            output += ndi._encode_number(field_len, 1)
+        output += bin_format + bin_options
+        header_len = len(self.magic) + 1 + 4 + len(output)
+        return bytearray(self.magic) + ndi._encode_number(self.version, 1) + ndi._encode_number(header_len, 4) + output
+
+    @classmethod
+    def read(cls, file):
+        """
+        Read the header at the current position of a file. If there is no header, the position is left unchanged.
+        :param file: File, a binary file positioned at the beginning of an inverted file
+        :return: IndexHeader, the header read, None if the file has no header
+        """
+        start = file.tell()
+        if file.read(len(cls.magic)) != cls.magic:
+            file.seek(start)
+            return None
+
+        version = ndi.decode_number(file.read(1))
+        if version > cls.version:
+            raise IndexFormatError('Unsupported inverted file version ({} > {})'.format(version, cls.version))
+        header_len = ndi.decode_number(file.read(4))
+        bin_header = file.read(header_len - len(cls.magic) - 1 - 4)
+
+        format_len = bin_header[8]
+        format_name = bin_header[9:9 + format_len].decode('utf-8')
+        if format_name not in cls.formats:
+            raise IndexFormatError('Unknown inverted file format <{}>'.format(format_name))
+        header = cls(cls.formats[format_name], ndi.decode_number(bin_header[:4]),
+                     json.loads(bin_header[9 + format_len:].decode('utf-8')))
+        header.id_len, header.score_len, header.list_len_len, header.key_len_len = bin_header[4:8]
+        return header
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Read the header of an inverted file
+        :param filename: string, the path of the inverted file
+        :return: IndexHeader, the header of the file, None if the file has no header
+        """
+        with open(filename, 'rb') as f:
+            return cls.read(f)
+
+    def quantizer(self):
+        """
+        :return: ScoreQuantizer, the quantizer of the scores of the inverted file, None if they are not quantized
+        """
+        if 'quantization' not in self.options:
+            return None
+        return ScoreQuantizer.from_options(self.options['quantization'])
+
+    def interfacer(self):
+        """
+        :return: class, the interfacer able to decode the inverted file. If the field widths recorded differ from the
+                 ones of the registered interfacer, a subclass with the recorded widths is returned. If the scores are
+                 quantized, the interfacer dequantizes them (see ScoreQuantizer.interfacer)
+        """
+        interfacer = self.formats[self.format_name]
+        quantizer = self.quantizer()
+        widths = {'id_len': self.id_len, 'list_len_len': self.list_len_len, 'key_len_len': self.key_len_len}
+        if quantizer is None:
+            widths['score_len'] = self.score_len  # otherwise, the quantizer sets the width of the scores itself
+        if not all(getattr(interfacer, name) == value for name, value in widths.items()):
+            interfacer = type(interfacer.__name__, (interfacer,), widths)
+        if quantizer is not None:
+            interfacer = quantizer.interfacer(interfacer)
+        return interfacer
+
+    @classmethod
+    def verify(cls, filename):
+        """
+        Check that the content of an inverted file matches the checksum of its header
+        :param filename: string, the path of the inverted file
+        :return: IndexHeader, the header of the file, None if the file has no header (nothing can be checked)
+        """
+        with open(filename, 'rb') as f:
+            header = cls.read(f)
+            if header is None:
+                return None
+            checksum = 0
+            while True:
+                chunk = f.read(1024 * 1024)
+                if not chunk:
+                    break
+                checksum = zlib.crc32(chunk, checksum)
+        if checksum != header.checksum:
+            raise IndexFormatError('Inverted file <{}> is corrupted (checksum {} != {})'.format(
+                filename, checksum, header.checksum))
+        return header
+
+
+for registered_interfacer in (ndi, sdi, adi):
+    IndexHeader.register(registered_interfacer)
@@ -0,0 +1,118 @@
+import mmap
+import os
+
+from pyscripts.date_index import DateIndex
+from pyscripts.doc_id_map import DocIdMap
+from pyscripts.index_header import IndexHeader
+from pyscripts.inverted_file import InvertedFile
+from pyscripts.lexicon import Lexicon
+from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer as ndi
+
+
+class IndexReader(object):
+    """
+    Class made to read the posting lists of an inverted file saved on disc through cursors, so that a query only
+    decodes the parts of the posting lists it visits. The inverted file is read through a memory map, and its posting
+    lists are found with its lexicon. The cursors read the posting lists straight from the memory map, which stays
+    mapped as long as a cursor is alive, even once the reader is closed.
+    Initialize :
+        - filename : string, the path of the inverted file
+        - interfacer : class, the way the inverted file is encoded if it has no header. Default is NaiveDiscInterfacer
+        - lexicon : Lexicon, the lexicon of the inverted file if it has already been read. Default is None
+        - doc_id_map : DocIdMap, the map of the reassigned doc_ids of the inverted file if it has already been read.
+          Default is None
+
+    Attributes :
+        - interfacer : class, the interfacer decoding the inverted file (the one recorded in its header if any)
+        - header : IndexHeader, the header of the inverted file, None if it has none
+        - lexicon : Lexicon, the lexicon of the inverted file
+        - doc_id_map : DocIdMap, the map from the internal doc_ids of the inverted file to the DOCIDs, None if its
+          doc_ids have not been reassigned
+        - __date_index : DateIndex, the date index of the inverted file once read by <date_index>
+        - __positions_lexicon : Lexicon, the lexicon of the positions file once read by <positions_lexicon>
+        - __mmap : mmap, the memory map of the inverted file, None once the reader is closed
+    """
+
+    def __init__(self, filename, interfacer=ndi, lexicon=None, doc_id_map=None):
+        self.__file = open(filename, 'rb')
+        self.header = IndexHeader.read(self.__file)
+        self.interfacer = self.header.interfacer() if self.header is not None else interfacer
+        self.lexicon = lexicon if lexicon is not None else InvertedFile.read_lexicon(filename, self.interfacer)
+        ids_filename = InvertedFile.ids_filename(filename)
+        self.doc_id_map = doc_id_map
+        if doc_id_map is None and os.path.exists(ids_filename):
+            self.doc_id_map = DocIdMap.load(ids_filename)
+        self.__filename = filename
+        self.__date_index = None
+        self.__positions_lexicon = None
+        self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __contains__(self, key):
+        return key in self.lexicon
+
+    def close(self):
+        """
+        Release the memory map and the file. The cursors already opened remain usable : each one holds a view on the
+        memory map, which is only unmapped once the last of them is released
+        :return: None
+        """
+        if self.__mmap is None:
+            return
+        try:
+            self.__mmap.close()
+        except BufferError:
+            # Views exported to living cursors, the map is unmapped when their reference count drops to zero
+            pass
+        self.__mmap = None
+        self.__file.close()
+
+    def date_index(self):
+        """
+        Read the date index of the inverted file the first time it is needed
+        :return: DateIndex, the date index of the inverted file, None if it has none
+        """
+        dates_filename = InvertedFile.dates_filename(self.__filename)
+        if self.__date_index is None and os.path.exists(dates_filename):
+            self.__date_index = DateIndex.load(dates_filename)
+        return self.__date_index
+
+    def positions_lexicon(self):
+        """
+        Read the lexicon of the positions file of the inverted file the first time it is needed
+        :return: Lexicon, the lexicon of the positions file (see InvertedFile.read_positional_lists), None if it has
+                 none
+        """
+        lexicon_filename = InvertedFile.lexicon_filename(InvertedFile.positions_filename(self.__filename))
+        if self.__positions_lexicon is None and os.path.exists(lexicon_filename):
+            self.__positions_lexicon = Lexicon.load(lexicon_filename)
+        return self.__positions_lexicon
+
+    def doc_freq(self, key):
+        """
+        :param key: string, a key of the inverted file
+        :return: integer, the number of documents referencing the key, 0 if the key is not in the inverted file
+        """
+        return self.lexicon.doc_freq(key)
+
+    def cursor(self, key):
+        """
+        Open a cursor on the posting list of a key. The cursor reads the encoded posting list through a view on the
+        memory map, without copying it, and decodes it as it moves (see the cursor method of the interfacers)
+        :param key: string, a key of the inverted file
+        :return: PostingCursor, positioned on the first posting of the key, None if the key is not in the inverted file
+        :raise ValueError: if the reader is closed
+        """
+        if self.__mmap is None:
+            raise ValueError('Can not open a cursor on a closed IndexReader')
+        entry = self.lexicon.get(key)
+        if entry is None:
+            return None
+        offset, list_len, doc_freq, _ = entry
+        start = offset + self.interfacer.key_len_len + len(key.encode('utf-8')) + self.interfacer.list_len_len
+        return self.interfacer.cursor(memoryview(self.__mmap)[start:start + list_len], doc_freq)
@@ -1,6 +1,15 @@
+import os
+import shutil
+import zlib
+
 from sortedcontainers import SortedDict as sd
 from sortedcontainers import SortedList
+from pyscripts.date_index import DateIndex
+from pyscripts.document_store import DocumentStore
+from pyscripts.index_header import IndexHeader, IndexFormatError
+from pyscripts.lexicon import Lexicon
 from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer as ndi
+from pyscripts.positional_disc_interfacer import PositionalDiscInterfacer as pdi
 
 
 class OutOfBoundError(Exception):
@@ -29,6 +38,13 @@ class InvertedFile(object):
               - integer, a score relative to a word and an article. Please note that the score is expected to be relative 
                 to a specific "word", not to "the word XXX at the position XXX". For example, in the article "The black hound ate the 
                 black bear.", there is a single, unique score relative to the word "black". 
+        - disc_interfacer : class, one of NaiveDiscInterfacer, SmartDiscInterfacer and AdaptiveDiscInterfacer, the way the
+          index is encoded on disc. The inverted files are saved with a header (see IndexHeader) recording it, so that
+          they are read back with the right interfacer whatever this one is
+        - positional : boolean, whether the positions of the words in the documents must be indexed too, to allow
+          phrase and proximity queries. The positions are saved in a separate file (see <positions_filename>)
+        - document_store : DocumentStore, None by default. If given, the metadata of every added document is kept in it
+          and saved next to the index (see <documents_filename>)
 
     Attributes :
         - __map : SortedDict, the structure used to store the index in memory. Shape (key: string, value: List)
@@ -38,12 +54,32 @@ class InvertedFile(object):
                 - score : integer, the score computed by __score_function for the association (key, doc)
        - __score_function : the score_function sent in parameter for __init__, memorized by the index (see Initialize/score_function for 
          more infos)
+        - __positions : SortedDict, None if the index is not positional. Shape (key: string, value: List)
+            - key : string, words found in various documents
+            - value : list, list of pairs (docid, positions) :
+                - docid : integer, the id of a document
+                - positions : list of integer, the positions of the word in the document, counted in tokens from the
+                  beginning of the text, the title being considered as the last paragraph, and paragraph_gap positions
+                  being skipped after each paragraph
+        - document_store : the document_store sent in parameter for __init__
+        - __dates : DateIndex, the day each added document was written, saved next to the index (see
+          <dates_filename>)
+
+    Class Attributes :
+        - paragraph_gap : integer, the number of positions skipped between two paragraphs, so that neither a phrase nor
+          a proximity query of distance lower than the gap matches across two paragraphs. It is recorded in the header
+          of a positional inverted file, and ProximityQuery refuses the larger distances
     """
 
-    def __init__(self, score_function, disc_interfacer=ndi):
+    paragraph_gap = 100
+
+    def __init__(self, score_function, disc_interfacer=ndi, positional=False, document_store=None):
         self.__map = sd()
         self.__score_function = score_function
         self.di = disc_interfacer
+        self.__positions = sd() if positional else None
+        self.document_store = document_store
+        self.__dates = DateIndex()
 
     @property
     def map(self):
@@ -59,6 +95,63 @@ class InvertedFile(object):
         Setter for the attribute __map, forbidding outside modifications
         """
         pass
+
+    @property
+    def positions(self):
+        """
+        Getter for the attribute __positions
+        :return: SortedDict, a reference to the __positions attribute, None if the index is not positional
+        """
+        return self.__positions
+
+    @staticmethod
+    def positions_filename(filename):
+        """
+        :param filename: string, the path of an inverted file
+        :return: string, the path of the file holding the positions associated with this inverted file
+        """
+        return filename + '.pos'
+
+    @staticmethod
+    def documents_filename(filename):
+        """
+        :param filename: string, the path of an inverted file
+        :return: string, the path of the document store associated with this inverted file
+        """
+        return filename + '.docs'
+
+    @staticmethod
+    def lexicon_filename(filename):
+        """
+        :param filename: string, the path of an inverted file
+        :return: string, the path of the lexicon associated with this inverted file
+        """
+        return filename + '.lex'
+
+    @staticmethod
+    def pairs_filename(filename):
+        """
+        :param filename: string, the path of an inverted file
+        :return: string, the path of the pair index associated with this inverted file (see PairIndex)
+        """
+        return filename + '.pairs'
+
+    @staticmethod
+    def ids_filename(filename):
+        """
+        :param filename: string, the path of an inverted file
+        :return: string, the path of the map from the internal doc_ids of this inverted file to the DOCIDs of the
+                 documents, if its doc_ids have been reassigned (see DocIdMap)
+        """
+        return filename + '.ids'
+
+    @staticmethod
+    def dates_filename(filename):
+        """
+        :param filename: string, the path of an inverted file
+        :return: string, the path of the date index associated with this inverted file (see DateIndex)
+        """
+        return filename + '.dates'
     
     def add_document(self, document):
         """
@@ -73,15 +166,30 @@ class InvertedFile(object):
         """
         paragraph_tokens = document["text"].copy()
         paragraph_tokens.append(document["title"])
-        seen_list = []
+        seen_list = set()
+        document_positions = {}
+        position = 0
         for paragraph in paragraph_tokens:
             for token in paragraph:
+                if self.__positions is not None:
+                    document_positions.setdefault(token, []).append(position)
+                position += 1
                 if token not in seen_list:
-                    seen_list.append(token)
+                    seen_list.add(token)
                     score = self.__score_function(token, document)
                     if token not in self.__map:
                         self.__map[token] = SortedList()
                     self.__map[token].add((document['id'], score))
+            position += self.paragraph_gap
+
+        for token, positions in document_positions.items():
+            if token not in self.__positions:
+                self.__positions[token] = SortedList()
+            self.__positions[token].add((document['id'], positions))
+
+        if self.document_store is not None:
+            self.document_store.add_document(document)
+        self.__dates.add_document(document)
                     
 #----------------------------------------------------------------------------------------------------------------------------------------#
 #---------------------------------------------------------SAVE AND LOAD------------------------------------------------------------------#
@@ -97,39 +205,207 @@ class InvertedFile(object):
             output += self.di.encode_posting_list(key, value)
         return output
     
-    def save(self, filename):
+    def save(self, filename, dense_threshold=None, quantizer=None, save_dates=True):
         """
-        Save the InvertedFile to the disc
+        Save the InvertedFile to the disc, preceded by its header. The files left next to a previous inverted file of
+        the same path are removed first (see __remove_sidecars)
         :param filename: string, the path of the inverted file to be saved on disc
+        :param dense_threshold: float, only for AdaptiveDiscInterfacer, the density from which a posting list is saved
+                                as a bitmap (see AdaptiveDiscInterfacer.dense_threshold). Default is the one of the
+                                interfacer
+        :param quantizer: ScoreQuantizer, None by default. If given, the scores are saved quantized by it (a per index
+                          quantizer is fitted on the highest score of the index first)
+        :param save_dates: boolean, whether the date index is saved (see <dates_filename>). Default is True, False for
+                           the inverted files which are not queried by date on their own (a pair index)
         :return: None
         """
+        encode_options = {}
+        if dense_threshold is not None:
+            if not hasattr(self.di, 'dense_threshold'):
+                raise ValueError('The interfacer {} can not save dense posting lists as bitmaps'.format(self.di.__name__))
+            encode_options['dense_threshold'] = dense_threshold
+        interfacer, options = self.__quantized_interfacer(self.di, quantizer, encode_options,
+                                                          lambda: max((score for value in self.__map.values()
+                                                                       for _, score in value), default=0))
+        if self.__positions is not None:
+            options['paragraph_gap'] = self.paragraph_gap
+
+        self.__remove_sidecars(filename)
         output = bytearray()
+        entries = []
         for (key, value) in self.__map.iteritems():
-            output += self.di.encode_posting_list(key, value)
+            record = interfacer.encode_posting_list(key, value, **encode_options)
+            entries.append((key, len(output), self.__list_len_of_record(key, record, interfacer), len(value),
+                            max((score for _, score in value), default=0)))
+            output += record
+        header = IndexHeader(interfacer, zlib.crc32(output), options).encode()
         with open(filename, 'wb+')as f:
+            f.write(header)
             f.write(output)
+
+        lexicon = Lexicon()
+        for (key, offset, list_len, doc_freq, max_score) in entries:
+            lexicon.add(key, len(header) + offset, list_len, doc_freq, max_score)
+        lexicon.save(self.lexicon_filename(filename))
+
+        if self.__positions is not None:
+            output = bytearray()
+            lexicon = Lexicon()
+            for (key, value) in self.__positions.items():
+                record = pdi.encode_positional_list(key, value)
+                lexicon.add(key, len(output), self.__list_len_of_record(key, record, pdi), len(value))
+                output += record
+            with open(self.positions_filename(filename), 'wb+') as f:
+                f.write(output)
+            lexicon.save(self.lexicon_filename(self.positions_filename(filename)))
+
+        if self.document_store is not None:
+            self.document_store.save(self.documents_filename(filename))
+
+        if save_dates:
+            # saved even if no date could be read : a document whose date is unknown is in no range of dates, so a query
+            # restricted to a range of dates matches no document of an inverted file without any date
+            self.__dates.save(self.dates_filename(filename))
+
+    @classmethod
+    def __remove_sidecars(cls, filename):
+        """
+        Remove the files saved next to an inverted file (positions, document store, pair index, doc_id map and date
+        index) before it is written again, so that the ones the new inverted file does not have are not read with it.
+        The pair index, built on the previous posting lists, is always removed.
+        :param filename: string, the path of an inverted file
+        :return: None
+        """
+        positions_filename, pairs_filename = cls.positions_filename(filename), cls.pairs_filename(filename)
+        for sidecar in (positions_filename, cls.lexicon_filename(positions_filename), cls.documents_filename(filename),
+                        pairs_filename, cls.lexicon_filename(pairs_filename), cls.dates_filename(pairs_filename),
+                        cls.ids_filename(filename), cls.dates_filename(filename)):
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+
+    @staticmethod
+    def __quantized_interfacer(disc_interfacer, quantizer, encode_options, max_score):
+        """
+        :param disc_interfacer: class, the way the inverted file is encoded
+        :param quantizer: ScoreQuantizer, None if the scores are not quantized
+        :param encode_options: dictionary, the options given to the encoding of every posting list
+        :param max_score: function of prototype [float function()], computing the highest score of the index, only
+                          called to fit a per index quantizer
+        :return: a tuple (interfacer, options), the interfacer encoding the inverted file, and the options to record in
+                 its header
+        """
+        options = dict(encode_options)
+        if quantizer is None:
+            return disc_interfacer, options
+        if not quantizer.per_term:
+            quantizer.fit(max_score())
+        options['quantization'] = quantizer.options()
+        return quantizer.interfacer(disc_interfacer), options
             
-    def read_posting_lists(self, keys, filename):
+    def read_posting_lists(self, keys, filename, lexicon=None):
         """
         Read and decode the posting lists correspoself.ding to their associated keys given in parameters, from a given file.
         Load them into the current object.
+        If the inverted file has a lexicon, the posting lists are read directly from their position in the file.
+        If the inverted file has a header, it is decoded with the interfacer recorded in the header instead of self.di.
         :param keys: list of string, represents the posting lists that need to be decoded
         :param filename: string, the name of the file to read on disc
+        :param lexicon: Lexicon, the lexicon of the inverted file if it has already been read. Default is None
         :return: None
         """
+        if keys is not None and lexicon is None and os.path.exists(self.lexicon_filename(filename)):
+            lexicon = Lexicon.load(self.lexicon_filename(filename))
+        if keys is not None and lexicon is not None:
+            with open(filename, 'rb') as f:
+                interfacer = self.__read_interfacer(f, self.di)
+                for key in keys:
+                    entry = lexicon.get(key)
+                    if entry is None:
+                        continue
+                    f.seek(entry[0])
+                    _, list_len = self.__read_key_and_list_len(f, interfacer)
+                    self.__map[key] = interfacer.decode_list(f.read(list_len))
+            return
+
         with open(filename, 'rb') as f:
+            interfacer = self.__read_interfacer(f, self.di)
 
             while True:
-                key, list_len = self.__read_key_and_list_len(f, self.di)
+                key, list_len = self.__read_key_and_list_len(f, interfacer)
                 if key is None:
                     break
                 # if key is one of the wanted keys
                 if keys is None or key in keys:
-                    posting_list = self.di.decode_list(f.read(list_len))
+                    posting_list = interfacer.decode_list(f.read(list_len))
                     self.__map[key] = posting_list
                 else:
                     f.seek(list_len, 1)
     
+    @classmethod
+    def read_positional_lists(cls, keys, filename, lexicon=None):
+        """
+        Read the positional posting lists corresponding to the given keys, without decoding them.
+        If the positions file has a lexicon, the positional lists are read directly from their position in the file.
+        Precondition : the inverted file has been saved with positional=True
+        :param keys: list of string, represents the positional posting lists that need to be read
+        :param filename: string, the path of the inverted file (not of the positions file)
+        :param lexicon: Lexicon, the lexicon of the positions file if it has already been read. Default is None
+        :return: dictionary (key: string, value: PositionalPostingList), the positional posting lists found
+        """
+        output = {}
+        positions_filename = cls.positions_filename(filename)
+        if keys is not None and lexicon is None and os.path.exists(cls.lexicon_filename(positions_filename)):
+            lexicon = Lexicon.load(cls.lexicon_filename(positions_filename))
+        with open(positions_filename, 'rb') as f:
+            if keys is not None and lexicon is not None:
+                for key in keys:
+                    entry = lexicon.get(key)
+                    if entry is None:
+                        continue
+                    f.seek(entry[0])
+                    _, list_len = cls.__read_key_and_list_len(f, pdi)
+                    output[key] = pdi.decode_list(f.read(list_len))
+                return output
+
+            while True:
+                key, list_len = cls.__read_key_and_list_len(f, pdi)
+                if key is None:
+                    break
+                if keys is None or key in keys:
+                    output[key] = pdi.decode_list(f.read(list_len))
+                else:
+                    f.seek(list_len, 1)
+
+        return output
+
+    @classmethod
+    def read_lexicon(cls, filename, interfacer=ndi):
+        """
+        Read the lexicon of an inverted file. If the inverted file has been saved without lexicon, it is rebuilt by
+        walking through the inverted file, which implies to decode every posting list.
+        :param filename: string, the path of the inverted file
+        :param interfacer: class, the way the inverted file is encoded, only used if the lexicon must be rebuilt from
+                           an inverted file without header
+        :return: Lexicon, the lexicon of the inverted file
+        """
+        if os.path.exists(cls.lexicon_filename(filename)):
+            return Lexicon.load(cls.lexicon_filename(filename))
+
+        lexicon = Lexicon()
+        with open(filename, 'rb') as f:
+            interfacer = cls.__read_interfacer(f, interfacer)
+
+            while True:
+                position = f.tell()
+                key, list_len = cls.__read_key_and_list_len(f, interfacer)
+                if key is None:
+                    break
+                posting_list = interfacer.decode_list(f.read(list_len))
+                lexicon.add(key, position, list_len, len(posting_list),
+                            max((score for _, score in posting_list), default=0))
+
+        return lexicon
+
     @classmethod
     def read_only_keys(cls, filename, interfacer=ndi):
         """
@@ -139,6 +415,7 @@ class InvertedFile(object):
         """
         output = []
         with open(filename, 'rb') as f:
+            interfacer = cls.__read_interfacer(f, interfacer)
 
             while True:
                 position = f.tell()
@@ -150,6 +427,28 @@ class InvertedFile(object):
 
         return output
                     
+    @classmethod
+    def read_interfacer(cls, filename, interfacer=ndi):
+        """
+        Find out how an inverted file is encoded
+        :param filename: string, the path of the inverted file
+        :param interfacer: class, the interfacer returned if the inverted file has no header
+        :return: class, the interfacer recorded in the header of the inverted file
+        """
+        with open(filename, 'rb') as f:
+            return cls.__read_interfacer(f, interfacer)
+
+    @classmethod
+    def __read_interfacer(cls, file, interfacer=ndi):
+        """
+        Read the header of an inverted file, if it has one, and leave the file positioned on its first posting list
+        :param file: File, the binary file of the inverted file, positioned at its beginning
+        :param interfacer: class, the interfacer returned if the inverted file has no header
+        :return: class, the interfacer recorded in the header
+        """
+        header = IndexHeader.read(file)
+        return header.interfacer() if header is not None else interfacer
+
     @classmethod
     def __read_key_and_list_len(cls, file, interfacer=ndi):
         """
@@ -176,6 +475,28 @@ class InvertedFile(object):
 
         return key, list_len
     
+    @classmethod
+    def __list_len_of_record(cls, key, record, interfacer=ndi):
+        """
+        :param key: string, the key of an encoded record
+        :param record: bytearray, a record <key_size><key><list_len><list>, as encoded by the interfacer
+        :param interfacer: class, the interfacer which encoded the record
+        :return: integer, the length (in bytes) of the encoded posting list
+        """
+        return len(record) - interfacer.key_len_len - len(key.encode('utf-8')) - interfacer.list_len_len
+
+    @staticmethod
+    def __max_score(posting_list, interfacer):
+        """
+        :param posting_list: list of tuples (doc_id, value), a merged or remapped list
+        :param interfacer: class, the interfacer of the file the list is written to, None for a file without header
+                           (a positions file, whose values are positions and not scores)
+        :return: float, the highest score of the list, 0 if it has no score
+        """
+        if interfacer is None:
+            return 0
+        return max((score for _, score in posting_list), default=0)
+
     @classmethod
     def __read_key_and_posting_list(cls, file, interfacer=ndi):
         """
@@ -198,21 +519,127 @@ class InvertedFile(object):
 #----------------------------------------------------------------------------------------------------------------------------------------#
 
     @classmethod
-    def merge_inverted_files(cls, filename_merge, filename_if1, filename_if2, disc_interfacer):
+    def merge_inverted_files(cls, filename_merge, filename_if1, filename_if2, disc_interfacer, quantizer=None):
         """
-        Merge two inverted files saved on disc into one.
+        Merge two inverted files saved on disc into one. The files left next to a previous inverted file at
+        filename_merge are removed first, its pair index included.
         :param filename_merge: string, the path to the newly created inverted file
         :param filename_if1: string, the path to the first inverted file to merge
         :param filename_if2: string, the path to the second inverted file to merge
-        :param disc_interfacer: class, one of NaiveDiscInterfacer and SmartDiscInterfacer, explain the way if1 and if2 are encoded
+        :param disc_interfacer: class, one of NaiveDiscInterfacer, SmartDiscInterfacer and AdaptiveDiscInterfacer, explain
+                                the way the merged file is encoded, and the way if1 and if2 are encoded if they have no
+                                header
+        :param quantizer: ScoreQuantizer, None by default. If given, the scores of the merged file are quantized by it,
+                          whatever the quantization of if1 and if2. Otherwise, they are quantized as the ones of if1 and
+                          if2, which must be quantized alike (same bits, scale and per_term) or not at all
+        :return: None
+        :raise IndexFormatError: if if1 and if2 are encoded with different formats, if their scores are quantized
+                                 differently and no quantizer is given, or if the doc_ids of one of them have been
+                                 reassigned (see remap_inverted_file)
+        """
+        # the internal doc_ids of two remapped files overlap, and are not ordered as the DOCIDs of the other file :
+        # the inverted files must be merged before being remapped
+        for filename in (filename_if1, filename_if2):
+            if os.path.exists(cls.ids_filename(filename)):
+                raise IndexFormatError('Can not merge the inverted file <{}>, its doc_ids have been reassigned : merge '
+                                       'the inverted files before remapping them'.format(filename))
+        interfacer_if1 = cls.read_interfacer(filename_if1, disc_interfacer)
+        interfacer_if2 = cls.read_interfacer(filename_if2, disc_interfacer)
+        if interfacer_if1.format_name != interfacer_if2.format_name:
+            raise IndexFormatError('Can not merge inverted files of different formats ({} and {})'.format(
+                interfacer_if1.format_name, interfacer_if2.format_name))
+
+        # each file is decoded with its own interfacer, so that the quantized scores are dequantized with their own
+        # max_score, and quantized again for the merged file : a per index quantization is fitted again on the highest
+        # score of both files. The dense_threshold given when saving the first inverted file applies to the merged one
+        headers = [IndexHeader.load(filename) for filename in (filename_if1, filename_if2)]
+        encode_options = {}
+        if headers[0] is not None and 'dense_threshold' in headers[0].options:
+            encode_options['dense_threshold'] = headers[0].options['dense_threshold']
+        if quantizer is None:
+            quantizers = [header.quantizer() if header is not None else None for header in headers]
+            settings = [(q.bits, q.scale, q.per_term) if q is not None else None for q in quantizers]
+            if settings[0] != settings[1]:
+                raise IndexFormatError('Can not merge inverted files whose scores are quantized differently ({} and '
+                                       '{}), a quantizer must be given to quantize them again'.format(*settings))
+            quantizer = quantizers[0]
+
+        def max_score():
+            lexicons = [cls.read_lexicon(filename, disc_interfacer) for filename in (filename_if1, filename_if2)]
+            return max((lexicon.max_score(key) for lexicon in lexicons for key in lexicon.keys()), default=0)
+
+        interfacer, options = cls.__quantized_interfacer(disc_interfacer, quantizer, encode_options, max_score)
+        positions_if1 = cls.positions_filename(filename_if1)
+        positions_if2 = cls.positions_filename(filename_if2)
+        gaps = [header.options.get('paragraph_gap') if header is not None else None for header in headers]
+        if os.path.exists(positions_if1) and os.path.exists(positions_if2) and None not in gaps:
+            options['paragraph_gap'] = min(gaps)
+
+        cls.__remove_sidecars(filename_merge)
+        lexicon = Lexicon()
+        cls.__merge_files(filename_merge, filename_if1, filename_if2, (interfacer_if1, interfacer_if2),
+                          lambda bin_list, input_interfacer: list(input_interfacer.decode_list(bin_list)),
+                          lambda key, posting_list: interfacer.encode_posting_list(key, posting_list, **encode_options),
+                          lexicon, interfacer, options)
+        lexicon.save(cls.lexicon_filename(filename_merge))
+
+        if os.path.exists(positions_if1) and os.path.exists(positions_if2):
+            positions_lexicon = Lexicon()
+            cls.__merge_files(cls.positions_filename(filename_merge), positions_if1, positions_if2, (pdi, pdi),
+                              lambda bin_list, _: pdi.decode_list(bin_list).items(), pdi.encode_positional_list,
+                              positions_lexicon)
+            positions_lexicon.save(cls.lexicon_filename(cls.positions_filename(filename_merge)))
+
+        documents_if1 = cls.documents_filename(filename_if1)
+        documents_if2 = cls.documents_filename(filename_if2)
+        if os.path.exists(documents_if1) and os.path.exists(documents_if2):
+            DocumentStore.merge_document_stores(cls.documents_filename(filename_merge), documents_if1, documents_if2)
+
+        # the dates of the documents of an inverted file without date index are unknown, not absent : the merged file
+        # has no date index either, so that a query restricted to a range of dates fails instead of dropping them
+        dates_if1 = cls.dates_filename(filename_if1)
+        dates_if2 = cls.dates_filename(filename_if2)
+        if os.path.exists(dates_if1) and os.path.exists(dates_if2):
+            date_index = DateIndex.merge(DateIndex.load(dates_if1), DateIndex.load(dates_if2))
+            date_index.save(cls.dates_filename(filename_merge))
+
+    @classmethod
+    def __merge_files(cls, filename_merge, filename_if1, filename_if2, input_interfacers, decode, encode, lexicon=None,
+                      interfacer=None, options=None):
+        """
+        Merge two files made of pairs (key, list) sorted by key into one.
+        :param filename_merge: string, the path to the newly created file
+        :param filename_if1: string, the path to the first file to merge
+        :param filename_if2: string, the path to the second file to merge
+        :param input_interfacers: tuple of two classes, the interfacers of the first and second files, giving the widths
+                                  of their keys and list lengths
+        :param decode: function of prototype [list function(bin_list, input_interfacer)], decoding a list read in one
+                       of the files with its interfacer
+        :param encode: function of prototype [bytearray function(key, list)], encoding a merged pair
+        :param lexicon: Lexicon, None by default. If given, every merged pair is referenced in it
+        :param interfacer: class, None by default. If given, the merged file starts with a header recording it
+        :param options: dictionary, None by default. The options recorded in the header of the merged file
         :return: None
         """
 
+        def read_next(file, input_interfacer):
+            key, list_len = cls.__read_key_and_list_len(file, input_interfacer)
+            if key is None:
+                return None, None
+            return key, decode(file.read(list_len), input_interfacer)
+
+        interfacer_if1, interfacer_if2 = input_interfacers
+
         with open(filename_merge, 'wb+') as output:
             with open(filename_if1, 'rb') as if1:
                 with open(filename_if2, 'rb') as if2:
-                    key_if1, pl_if1 = cls.__read_key_and_posting_list(if1)
-                    key_if2, pl_if2 = cls.__read_key_and_posting_list(if2)
+                    IndexHeader.read(if1)
+                    IndexHeader.read(if2)
+                    if interfacer is not None:
+                        output.write(IndexHeader(interfacer, 0, options).encode())
+                    checksum = 0
+                    key_if1, pl_if1 = read_next(if1, interfacer_if1)
+                    key_if2, pl_if2 = read_next(if2, interfacer_if2)
                     while True:
 
                         if key_if1 is None and key_if2 is None:
@@ -220,14 +647,125 @@ class InvertedFile(object):
                         elif key_if1 is not None and (key_if2 is None or key_if1 < key_if2):
                             posting_list = pl_if1
                             key = key_if1
-                            key_if1, pl_if1 = cls.__read_key_and_posting_list(if1)
+                            key_if1, pl_if1 = read_next(if1, interfacer_if1)
                         elif key_if1 is None or key_if1 > key_if2:
                             posting_list = pl_if2
                             key = key_if2
-                            key_if2, pl_if2 = cls.__read_key_and_posting_list(if2)
+                            key_if2, pl_if2 = read_next(if2, interfacer_if2)
                         else:
                             posting_list = pl_if1 + pl_if2
                             key = key_if1
-                            key_if1, pl_if1 = cls.__read_key_and_posting_list(if1)
-                            key_if2, pl_if2 = cls.__read_key_and_posting_list(if2)
-                        output.write(disc_interfacer.encode_posting_list(key, posting_list))
+                            key_if1, pl_if1 = read_next(if1, interfacer_if1)
+                            key_if2, pl_if2 = read_next(if2, interfacer_if2)
+                        record = encode(key, posting_list)
+                        if lexicon is not None:
+                            encoded_len = cls.__list_len_of_record(key, record, interfacer or interfacer_if1)
+                            lexicon.add(key, output.tell(), encoded_len, len(posting_list),
+                                        cls.__max_score(posting_list, interfacer))
+                        output.write(record)
+                        checksum = zlib.crc32(record, checksum)
+
+                    if interfacer is not None:
+                        output.seek(0)
+                        output.write(IndexHeader(interfacer, checksum, options).encode())
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#--------------------------------------------------REMAP INVERTED FILES------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    @classmethod
+    def remap_inverted_file(cls, filename_remap, filename, doc_id_map, disc_interfacer):
+        """
+        Rewrite an inverted file saved on disc with the internal doc_ids of a DocIdMap : every posting list (every
+        positional list, and the date index) is translated and sorted again, the options of the inverted file
+        (dense_threshold, quantization) are kept, and the map is saved next to the new inverted file so that the queries
+        report the DOCIDs of the documents. The document store is copied as is, as it is read with the DOCIDs of the
+        results. A pair index must be built again on the new inverted file : the files left next to a previous inverted
+        file at filename_remap are removed first.
+        :param filename_remap: string, the path to the newly created inverted file
+        :param filename: string, the path to the inverted file to remap
+        :param doc_id_map: DocIdMap, the internal id of every document of the inverted file
+        :param disc_interfacer: class, one of NaiveDiscInterfacer, SmartDiscInterfacer and AdaptiveDiscInterfacer,
+                                explain the way the new file is encoded, and the way the inverted file is encoded if it
+                                has no header
+        :return: None
+        """
+        input_interfacer = cls.read_interfacer(filename, disc_interfacer)
+        header = IndexHeader.load(filename)
+        encode_options = {}
+        quantizer = None
+        if header is not None:
+            if 'dense_threshold' in header.options:
+                encode_options['dense_threshold'] = header.options['dense_threshold']
+            quantizer = header.quantizer()
+
+        def max_score():
+            lexicon = cls.read_lexicon(filename, disc_interfacer)
+            return max((lexicon.max_score(key) for key in lexicon.keys()), default=0)
+
+        interfacer, options = cls.__quantized_interfacer(disc_interfacer, quantizer, encode_options, max_score)
+        if header is not None and 'paragraph_gap' in header.options:
+            options['paragraph_gap'] = header.options['paragraph_gap']
+
+        cls.__remove_sidecars(filename_remap)
+        lexicon = Lexicon()
+        cls.__remap_file(filename_remap, filename, input_interfacer, doc_id_map,
+                         lambda bin_list: input_interfacer.decode_list(bin_list),
+                         lambda key, posting_list: interfacer.encode_posting_list(key, posting_list, **encode_options),
+                         lexicon, interfacer, options)
+        lexicon.save(cls.lexicon_filename(filename_remap))
+        doc_id_map.save(cls.ids_filename(filename_remap))
+
+        if os.path.exists(cls.positions_filename(filename)):
+            positions_lexicon = Lexicon()
+            cls.__remap_file(cls.positions_filename(filename_remap), cls.positions_filename(filename), pdi, doc_id_map,
+                             lambda bin_list: pdi.decode_list(bin_list).items(), pdi.encode_positional_list,
+                             positions_lexicon)
+            positions_lexicon.save(cls.lexicon_filename(cls.positions_filename(filename_remap)))
+
+        if os.path.exists(cls.documents_filename(filename)):
+            shutil.copyfile(cls.documents_filename(filename), cls.documents_filename(filename_remap))
+
+        if os.path.exists(cls.dates_filename(filename)):
+            DateIndex.load(cls.dates_filename(filename)).remap(doc_id_map).save(cls.dates_filename(filename_remap))
+
+    @classmethod
+    def __remap_file(cls, filename_remap, filename, input_interfacer, doc_id_map, decode, encode, lexicon=None,
+                     interfacer=None, options=None):
+        """
+        Rewrite a file made of pairs (key, list) with the internal doc_ids of a DocIdMap.
+        :param filename_remap: string, the path to the newly created file
+        :param filename: string, the path to the file to remap
+        :param input_interfacer: class, the interfacer giving the widths of the keys and list lengths of the file
+        :param doc_id_map: DocIdMap, the internal id of every document of the file
+        :param decode: function of prototype [iterable function(bin_list)], decoding a list read in the file into
+                       tuples (doc_id, value)
+        :param encode: function of prototype [bytearray function(key, list)], encoding a remapped pair
+        :param lexicon: Lexicon, None by default. If given, every remapped pair is referenced in it
+        :param interfacer: class, None by default. If given, the new file starts with a header recording it
+        :param options: dictionary, None by default. The options recorded in the header of the new file
+        :return: None
+        """
+        with open(filename_remap, 'wb+') as output:
+            with open(filename, 'rb') as f:
+                IndexHeader.read(f)
+                if interfacer is not None:
+                    output.write(IndexHeader(interfacer, 0, options).encode())
+                checksum = 0
+                while True:
+                    key, list_len = cls.__read_key_and_list_len(f, input_interfacer)
+                    if key is None:
+                        break
+                    posting_list = sorted((doc_id_map.internal(doc_id), value)
+                                          for doc_id, value in decode(f.read(list_len)))
+                    record = encode(key, posting_list)
+                    if lexicon is not None:
+                        encoded_len = cls.__list_len_of_record(key, record, interfacer or input_interfacer)
+                        lexicon.add(key, output.tell(), encoded_len, len(posting_list),
+                                    cls.__max_score(posting_list, interfacer))
+                    output.write(record)
+                    checksum = zlib.crc32(record, checksum)
+
+                if interfacer is not None:
+                    output.seek(0)
+                    output.write(IndexHeader(interfacer, checksum, options).encode())
@@ -0,0 +1,126 @@
+import struct
+
+from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer as ndi
+
+
+class Lexicon(object):
+    """
+    Class made to represent the vocabulary of an inverted file : for each key, where its posting list is saved and
+    how many documents it references. It allows to read a posting list without walking through the whole inverted
+    file, to know the size of a posting list before reading it, and to bound the score of a key without reading it.
+    The lexicon is saved next to the inverted file, shaped as :
+    ( <key_size(key_len_len bytes)><key(key_size bytes)><offset(offset_len bytes)><list_len(list_len_len bytes)>
+      <doc_freq(doc_freq_len bytes)><max_score(max_score_len bytes, big endian double)> )*N
+
+    Class Attributes :
+        - offset_len : integer, the number of bytes used to encode the position of a posting list in the inverted file
+        - doc_freq_len : integer, the number of bytes used to encode the number of documents of a posting list
+        - max_score_len : integer, the number of bytes used to encode the highest score of a posting list
+
+    Attributes :
+        - __entries : dictionary (key: string, value: tuple), associates a key with a tuple
+          (offset, list_len, doc_freq, max_score):
+            - offset : integer, the position in the inverted file of the record <key_size><key><list_len><list>
+            - list_len : integer, the length (in bytes) of the encoded posting list
+            - doc_freq : integer, the number of documents in the posting list
+            - max_score : float, the highest score of the posting list, before any quantization
+    """
+
+    offset_len = 8
+    doc_freq_len = 4
+    max_score_len = 8
+
+    def __init__(self):
+        self.__entries = {}
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def add(self, key, offset, list_len, doc_freq, max_score=0):
+        """
+        Reference a posting list in the lexicon
+        :param key: string, the key of the posting list
+        :param offset: integer, the position of the record of the posting list in the inverted file
+        :param list_len: integer, the length (in bytes) of the encoded posting list
+        :param doc_freq: integer, the number of documents in the posting list
+        :param max_score: float, the highest score of the posting list. Default is 0
+        :return: None
+        """
+        self.__entries[key] = (offset, list_len, doc_freq, max_score)
+
+    def get(self, key):
+        """
+        :param key: string, a key of the inverted file
+        :return: a tuple (offset, list_len, doc_freq, max_score), None if the key is not in the inverted file
+        """
+        return self.__entries.get(key)
+
+    def doc_freq(self, key):
+        """
+        :param key: string, a key of the inverted file
+        :return: integer, the number of documents referencing the key, 0 if the key is not in the inverted file
+        """
+        entry = self.__entries.get(key)
+        return entry[2] if entry is not None else 0
+
+    def max_score(self, key):
+        """
+        :param key: string, a key of the inverted file
+        :return: float, the highest score of the posting list of the key, an upper bound of its contribution to the
+                 score of a document. 0 if the key is not in the inverted file
+        """
+        entry = self.__entries.get(key)
+        return entry[3] if entry is not None else 0
+
+    def keys(self):
+        """
+        :return: list of string, the keys of the lexicon, sorted
+        """
+        return sorted(self.__entries)
+
+    def save(self, filename):
+        """
+        Save the lexicon to the disc
+        :param filename: string, the path of the lexicon file
+        :return: None
+        """
+        output = bytearray()
+        for key in sorted(self.__entries):
+            offset, list_len, doc_freq, max_score = self.__entries[key]
+            output += ndi._encode_key(key)
+            output += ndi._encode_number(offset, self.offset_len)
+            output += ndi._encode_number(list_len, ndi.list_len_len)
+            output += ndi._encode_number(doc_freq, self.doc_freq_len)
+            output += struct.pack('>d', max_score)
+        with open(filename, 'wb+') as f:
+            f.write(output)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Read a lexicon saved on disc
+        :param filename: string, the path of the lexicon file
+        :return: Lexicon, the lexicon read
+        """
+        lexicon = cls()
+        with open(filename, 'rb') as f:
+            bin_lexicon = f.read()
+
+        offset = 0
+        while offset < len(bin_lexicon):
+            key_len = ndi.decode_number(bin_lexicon[offset:offset + ndi.key_len_len])
+            offset += ndi.key_len_len
+            key = bin_lexicon[offset:offset + key_len].decode('utf-8')
+            offset += key_len
+            values = []
+            for value_len in (cls.offset_len, ndi.list_len_len, cls.doc_freq_len):
+                values.append(ndi.decode_number(bin_lexicon[offset:offset + value_len]))
+                offset += value_len
+            values.append(struct.unpack('>d', bin_lexicon[offset:offset + cls.max_score_len])[0])
+            offset += cls.max_score_len
+            lexicon.add(key, *values)
+
+        return lexicon
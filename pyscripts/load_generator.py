@@ -0,0 +1,326 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pyscripts.document_store import DocumentStoreReader
+from pyscripts.index_reader import IndexReader
+from pyscripts.inverted_file import InvertedFile
+from pyscripts.query import FaginQuery, NaiveQuery, PlannedQuery
+from pyscripts.tokenizer import SplitTokenizer, Tokenizer
+
+QUERY_CLASSES = {'naive': NaiveQuery, 'fagin': FaginQuery, 'planned': PlannedQuery}
+TOKENIZERS = ('stemming', 'nltk', 'split')
+
+
+def make_tokenizer(name):
+    """
+    :param name: string, one of TOKENIZERS : 'stemming' is the Tokenizer used to build the inverted files, 'nltk' the
+            same without stemming, 'split' splits the queries on their white spaces. Only 'stemming' and 'nltk' need
+            the nltk data, which Tokenizer downloads when it is not installed yet
+    :return: the tokenizer of the queries
+    """
+    if name == 'split':
+        return SplitTokenizer
+    return Tokenizer(stemming=name == 'stemming')
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------WORKER---------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+_worker = {}
+
+
+def _init_worker(filename, query_class_name, tokenizer_name, documents_filename, cache_size):
+    """
+    Prepare a worker : the inverted file (with its lexicon) and its pair index are opened once, as the tokenizer and
+    the document store, and shared by every query the worker executes, as in a long running query node. Defined at
+    module level to be sent to the processes of the pool.
+    :param filename: string, the path of the inverted file
+    :param query_class_name: string, a key of QUERY_CLASSES
+    :param tokenizer_name: string, one of TOKENIZERS
+    :param documents_filename: string, the path of the document store the results are hydrated from, None to return
+            the results without their documents
+    :param cache_size: integer, the number of documents cached by the document store reader
+    :return: None
+    """
+    pairs_filename = InvertedFile.pairs_filename(filename)
+    _worker['filename'] = filename
+    _worker['query_class'] = QUERY_CLASSES[query_class_name]
+    _worker['tokenizer'] = make_tokenizer(tokenizer_name)
+    _worker['reader'] = IndexReader(filename)
+    _worker['pair_reader'] = IndexReader(pairs_filename) if os.path.exists(pairs_filename) else None
+    _worker['documents'] = DocumentStoreReader(documents_filename, cache_size) if documents_filename else None
+    _worker['lock'] = threading.Lock()
+
+
+def _execute_query(query, top_k, date_range=None):
+    """
+    Execute a query in a worker prepared by <_init_worker>. Defined at module level to be sent to the processes of
+    the pool.
+    :param query: string, the query
+    :param top_k: integer, the maximum number of documents returned
+    :param date_range: tuple (start, end) of datetime.date, see NaiveQuery.execute. Default is None
+    :return: a tuple (result_count, service_time, cache_hits, cache_misses) : the number of documents returned, the
+             time spent executing the query in seconds, and the lookups of the document store answered with and
+             without its cache
+    """
+    start = time.perf_counter()
+    results = _worker['query_class'](query, _worker['tokenizer'], _worker['filename']).share_readers(
+        _worker['reader'], _worker['pair_reader']).execute(top_k, date_range)
+    hits, misses = 0, 0
+    documents = _worker['documents']
+    if documents is not None:
+        with _worker['lock']:
+            hits, misses = documents.hits, documents.misses
+            documents.hydrate(results)
+            hits, misses = documents.hits - hits, documents.misses - misses
+    return len(results), time.perf_counter() - start, hits, misses
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------GENERATOR------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+class LoadGenerator(object):
+    """
+    Class made to replay a query log against an inverted file with concurrent workers, and to measure the throughput
+    and the latencies of the queries.
+    Without arrival rate, the load is closed : each worker sends its next query as soon as the previous one is
+    answered, and the latency of a query is the time it took to answer it.
+    With an arrival rate, the load is open : the queries arrive at random times (Poisson arrivals) whatever the
+    state of the workers, and the latency of a query is measured from its arrival, so that it includes the time it
+    waited for a worker. If the workers can not sustain the rate, the latencies grow with the queue.
+    Initialize :
+        - filename : string, the path of the inverted file
+        - query_class : string, a key of QUERY_CLASSES, the algorithm executing the queries. Default is 'naive'
+        - workers : integer, the number of queries executed at once. Default is 1
+        - rate : float, the number of queries arriving per second, None for a closed load. Default is None
+        - top_k : integer, the maximum number of documents returned by a query. Default is 10
+        - tokenizer : string, one of TOKENIZERS. Default is 'split', which needs no nltk data
+        - documents_filename : string, the path of a document store the results are hydrated from, None to skip the
+          hydration. Default is None
+        - cache_size : integer, the number of documents cached by the document store reader of each worker.
+          Default is 128
+        - threads : boolean, whether the workers are threads of this process instead of processes. Default is False
+        - seed : integer, the seed of the arrival times. Default is None
+        - date_range : tuple (start, end) of datetime.date, the range of dates every query is restricted to (see
+          NaiveQuery.execute), None for no restriction. Default is None
+
+    Attributes :
+        - __records : list of tuples (arrival, end, outcome), one per query sent : outcome is the tuple returned by
+          <_execute_query>, or the exception raised by the query
+    """
+
+    def __init__(self, filename, query_class='naive', workers=1, rate=None, top_k=10, tokenizer='split',
+                 documents_filename=None, cache_size=128, threads=False, seed=None, date_range=None):
+        if query_class not in QUERY_CLASSES:
+            raise ValueError('Unknown query class <{}>'.format(query_class))
+        if tokenizer not in TOKENIZERS:
+            raise ValueError('Unknown tokenizer <{}>'.format(tokenizer))
+        if workers < 1:
+            raise ValueError('At least one worker is needed')
+        if rate is not None and rate <= 0:
+            raise ValueError('The arrival rate must be positive')
+        self.__filename = filename
+        self.__query_class = query_class
+        self.__workers = workers
+        self.__rate = rate
+        self.__top_k = top_k
+        self.__tokenizer = tokenizer
+        self.__documents_filename = documents_filename
+        self.__cache_size = cache_size
+        self.__threads = threads
+        self.__random = random.Random(seed)
+        self.__date_range = date_range
+        self.__records = []
+
+    @staticmethod
+    def read_log(filename):
+        """
+        :param filename: string, the path of a query log, one query per line
+        :return: list of string, the queries of the log, the empty lines being skipped
+        """
+        with open(filename, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+
+    def run(self, queries, repeat=1):
+        """
+        Replay the queries and measure them
+        :param queries: list of string, the queries, sent in this order
+        :param repeat: integer, the number of times the queries are replayed. Default is 1
+        :return: dictionary, the report of the run (see <report>)
+        """
+        init_args = (self.__filename, self.__query_class, self.__tokenizer, self.__documents_filename,
+                     self.__cache_size)
+        if self.__threads:
+            _init_worker(*init_args)
+            executor = ThreadPoolExecutor(max_workers=self.__workers)
+        else:
+            executor = ProcessPoolExecutor(max_workers=self.__workers, initializer=_init_worker, initargs=init_args)
+
+        with executor:
+            # The workers are started and prepared before the measure begins
+            for future in [executor.submit(time.sleep, 0.01) for _ in range(self.__workers)]:
+                future.result()
+
+            self.__records = []
+            in_flight = threading.BoundedSemaphore(self.__workers)
+            start = time.perf_counter()
+            arrival = start
+            for query in queries * repeat:
+                if self.__rate is None:
+                    in_flight.acquire()
+                    arrival = time.perf_counter()
+                else:
+                    arrival += self.__random.expovariate(self.__rate)
+                    delay = arrival - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                future = executor.submit(_execute_query, query, self.__top_k, self.__date_range)
+                future.add_done_callback(self.__recorder(arrival, in_flight))
+        end = time.perf_counter()
+        return self.report(end - start)
+
+    def __recorder(self, arrival, in_flight):
+        """
+        :param arrival: float, the time the query arrived
+        :param in_flight: BoundedSemaphore, released once the query is answered if the load is closed
+        :return: function, the callback recording the outcome of the query when its future is done
+        """
+        def record(future):
+            end = time.perf_counter()
+            exception = future.exception()
+            self.__records.append((arrival, end, exception if exception is not None else future.result()))
+            if self.__rate is None:
+                in_flight.release()
+        return record
+
+    @staticmethod
+    def percentile(values, p):
+        """
+        :param values: list of number, sorted
+        :param p: number, between 0 and 100
+        :return: number, the nearest-rank p-th percentile of values, None if there is none
+        """
+        if not values:
+            return None
+        return values[max(0, -(-len(values) * p // 100) - 1)]
+
+    @classmethod
+    def __latency_report(cls, latencies):
+        """
+        :param latencies: list of float, in seconds
+        :return: dictionary, the mean, p50, p95, p99 and max of the latencies, in milliseconds
+        """
+        latencies = sorted(latency * 1000 for latency in latencies)
+        report = {'mean': sum(latencies) / len(latencies) if latencies else None}
+        for p in (50, 95, 99):
+            report['p{}'.format(p)] = cls.percentile(latencies, p)
+        report['max'] = latencies[-1] if latencies else None
+        return report
+
+    def report(self, duration):
+        """
+        :param duration: float, the time the run lasted, in seconds
+        :return: dictionary, the report of the last run :
+                 - the parameters of the run (query_class, workers, offered_rate, top_k, date_range)
+                 - queries, completed : the number of queries sent, and answered without error
+                 - duration_s, qps : the time the run lasted, and the number of queries answered per second
+                 - latency_ms : the latencies of the queries answered (see the class description)
+                 - service_time_ms : the time the workers spent executing the queries answered
+                 - results_per_query : the mean number of documents returned
+                 - errors : the number of queries which raised an exception, in total and per type of exception
+                 - caches : the hit rate of the caches used by the run (the document store, if the results are hydrated)
+        """
+        answered = [(arrival, end, outcome) for arrival, end, outcome in self.__records
+                    if not isinstance(outcome, BaseException)]
+        errors = {}
+        for _, _, outcome in self.__records:
+            if isinstance(outcome, BaseException):
+                errors[type(outcome).__name__] = errors.get(type(outcome).__name__, 0) + 1
+
+        report = {
+            'query_class': self.__query_class,
+            'workers': self.__workers,
+            'offered_rate': self.__rate,
+            'top_k': self.__top_k,
+            'date_range': [date.isoformat() if date is not None else None for date in self.__date_range]
+            if self.__date_range is not None else None,
+            'queries': len(self.__records),
+            'completed': len(answered),
+            'duration_s': duration,
+            'qps': len(answered) / duration if duration > 0 else None,
+            'latency_ms': self.__latency_report([end - arrival for arrival, end, _ in answered]),
+            'service_time_ms': self.__latency_report([outcome[1] for _, _, outcome in answered]),
+            'results_per_query': sum(outcome[0] for _, _, outcome in answered) / len(answered) if answered else None,
+            'errors': {'count': sum(errors.values()), 'by_type': errors},
+            'caches': {},
+        }
+        if self.__documents_filename:
+            hits = sum(outcome[2] for _, _, outcome in answered)
+            misses = sum(outcome[3] for _, _, outcome in answered)
+            report['caches']['document_store'] = {'hits': hits, 'misses': misses,
+                                                  'hit_rate': hits / (hits + misses) if hits + misses else None}
+        return report
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------COMMAND LINE---------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+def main(argv=None):
+    """
+    Replay a query log against an inverted file, and print the report of the run as JSON.
+    Usage : python -m pyscripts.load_generator <inverted file> <query log> [options], see --help
+    :param argv: list of string, the arguments of the command line. Default is sys.argv[1:]
+    :return: dictionary, the report of the run
+    """
+    parser = argparse.ArgumentParser(prog='python -m pyscripts.load_generator',
+                                     description='Replay a query log (one query per line) against an inverted file, '
+                                                 'and report the throughput and the latencies as JSON.')
+    parser.add_argument('index', help='the path of the inverted file')
+    parser.add_argument('log', help='the path of the query log')
+    parser.add_argument('--query-class', choices=sorted(QUERY_CLASSES), default='naive')
+    parser.add_argument('--workers', type=int, default=1, help='the number of queries executed at once')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='the number of queries arriving per second (open load). By default, each worker sends '
+                             'its next query as soon as the previous one is answered (closed load)')
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=1, help='the number of times the log is replayed')
+    parser.add_argument('--tokenizer', choices=TOKENIZERS, default='split',
+                        help='the tokenizer of the queries. stemming and nltk download the nltk data they need')
+    parser.add_argument('--documents', default=None,
+                        help='the path of a document store the results are hydrated from (its cache is reported)')
+    parser.add_argument('--cache-size', type=int, default=128)
+    parser.add_argument('--threads', action='store_true', help='use threads instead of processes as workers')
+    parser.add_argument('--seed', type=int, default=None, help='the seed of the arrival times')
+    parser.add_argument('--start', type=datetime.date.fromisoformat, default=None,
+                        help='only return the documents written from this date on (YYYY-MM-DD)')
+    parser.add_argument('--end', type=datetime.date.fromisoformat, default=None,
+                        help='only return the documents written until this date, included (YYYY-MM-DD)')
+    parser.add_argument('--output', default=None, help='the path the report is written to, in addition to stdout')
+    args = parser.parse_args(argv)
+
+    generator = LoadGenerator(args.index, args.query_class, args.workers, args.rate, args.top_k, args.tokenizer,
+                              args.documents, args.cache_size, args.threads, args.seed,
+                              (args.start, args.end) if args.start or args.end else None)
+    report = generator.run(LoadGenerator.read_log(args.log), args.repeat)
+    report['index'] = args.index
+    report['log'] = args.log
+    output = json.dumps(report, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    return report
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,9 +1,13 @@
+from pyscripts.posting_cursor import FixedWidthPostingCursor
+
+
 class NaiveDiscInterfacer(object):
     """
     Empty class used as namespace for the naive implementation of saving and reading an InvertedFile in binary
     
     Class Attributes :
 
+        - format_name : string, the name recorded in the header of the inverted files encoded by this interfacer
         - score_len : integer, the max number of bytes allowed for the encoding of a score
         - id_len : integer, the max number of bytes allowed for the encoding of a docid
         - list_len_len : integer, the max number of bytes allowed for the encoding of the size of a value associated in _map (in bytes)
@@ -12,6 +16,7 @@ class NaiveDiscInterfacer(object):
 
     """
 
+    format_name = 'naive'
     score_len = 4
     id_len = 6
     list_len_len = 4
@@ -169,3 +174,13 @@ class NaiveDiscInterfacer(object):
             output.append(cls._decode_article(bin_article))
 
         return output
+
+    @classmethod
+    def cursor(cls, bin_list, cost=None):
+        """
+        Open a cursor on a binary posting list, decoding only the postings visited
+        :param bin_list: bytes-like, the binary representation of a posting list
+        :param cost: integer, the number of postings if known. Unused, the number of postings is given by the length
+        :return: PostingCursor, positioned on the first posting
+        """
+        return FixedWidthPostingCursor(bin_list, cls.id_len, cls.score_len)
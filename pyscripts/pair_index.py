@@ -0,0 +1,132 @@
+import collections
+
+import nltk
+
+from pyscripts.index_header import IndexHeader
+from pyscripts.inverted_file import InvertedFile
+from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer as ndi
+from pyscripts.query import Query
+from pyscripts.query_planner import QueryPlanner
+from pyscripts.score_quantizer import ScoreQuantizer
+
+
+class PairIndex(object):
+    """
+    Empty class used as namespace to build the pair index of an inverted file : for some pairs of frequent tokens,
+    the intersection of their posting lists is precomputed, with the combined score of Query._score_function.
+    The pair index is itself an inverted file (with its lexicon), saved next to the indexed one
+    (see InvertedFile.pairs_filename), whose keys are built by QueryPlanner.pair_key. NaiveQuery and FaginQuery read
+    a pair instead of the posting lists of its two tokens as soon as it is in the pair index.
+    """
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def build(cls, filename, disc_interfacer=ndi, budget=64 * 1024 * 1024, max_terms=100, query_log=None,
+              tokenizer=nltk):
+        """
+        Build and save the pair index of an inverted file.
+        The candidate pairs are either every pair of the max_terms most frequent tokens, or every pair of tokens
+        found together in a query of the log. They are ranked by the number of postings the pair saves when a query
+        contains both tokens (multiplied by the number of such queries in the log), and added until the budget is
+        spent.
+        If the scores of the inverted file are quantized, the ones of the pair index are quantized the same way, with
+        the highest score of each pair.
+        :param filename: string, the path of the inverted file
+        :param disc_interfacer: class, the way the inverted file is encoded. The pair index is encoded the same way
+        :param budget: integer, the maximal size (in bytes) of the pair index
+        :param max_terms: integer, the number of most frequent tokens considered, if there is no query log
+        :param query_log: list of string, queries representative of the traffic. Default is None
+        :param tokenizer: the tokenizer used to build the inverted file, used to tokenize the query log
+        :return: list of string, the keys of the pairs saved
+        """
+        lexicon = InvertedFile.read_lexicon(filename, disc_interfacer)
+        if query_log is None:
+            candidates = cls.__frequent_pairs(lexicon, max_terms)
+        else:
+            candidates = cls.__logged_pairs(lexicon, query_log, tokenizer)
+
+        header = IndexHeader.load(filename)
+        quantizer = header.quantizer() if header is not None else None
+        if quantizer is not None:
+            quantizer = ScoreQuantizer(quantizer.bits, quantizer.scale, per_term=True)
+            pair_interfacer = quantizer.interfacer(disc_interfacer)
+        else:
+            pair_interfacer = disc_interfacer
+
+        source = InvertedFile(None, disc_interfacer)
+        pairs = InvertedFile(None, disc_interfacer)
+        size = 0
+        for token_1, token_2 in candidates:
+            for token in (token_1, token_2):
+                if token not in source.map:
+                    source.read_posting_lists([token], filename, lexicon)
+            key = QueryPlanner.pair_key(token_1, token_2)
+            posting_list = cls.__intersect(source.map[token_1], source.map[token_2])
+            record_size = len(pair_interfacer.encode_posting_list(key, posting_list))
+            if size + record_size > budget:
+                continue
+            size += record_size
+            pairs.map[key] = posting_list
+
+        pairs.save(InvertedFile.pairs_filename(filename), quantizer=quantizer, save_dates=False)
+        return list(pairs.map.keys())
+
+    @classmethod
+    def __frequent_pairs(cls, lexicon, max_terms):
+        """
+        :param lexicon: Lexicon, the lexicon of the inverted file
+        :param max_terms: integer, the number of most frequent tokens considered
+        :return: list of tuples (token_1, token_2), every pair of the most frequent tokens, the pairs of most frequent
+                 tokens first
+        """
+        frequent = sorted(lexicon.keys(), key=lambda token: lexicon.doc_freq(token), reverse=True)[:max_terms]
+        candidates = []
+        for index, token_1 in enumerate(frequent):
+            for token_2 in frequent[index + 1:]:
+                candidates.append((min(lexicon.doc_freq(token_1), lexicon.doc_freq(token_2)), token_1, token_2))
+        return [(token_1, token_2) for _, token_1, token_2 in sorted(candidates, reverse=True)]
+
+    @classmethod
+    def __logged_pairs(cls, lexicon, query_log, tokenizer):
+        """
+        :param lexicon: Lexicon, the lexicon of the inverted file
+        :param query_log: list of string, queries representative of the traffic
+        :param tokenizer: the tokenizer used to build the inverted file
+        :return: list of tuples (token_1, token_2), every pair of tokens of the inverted file found together in a
+                 query, the pairs saving the most postings over the whole log first
+        """
+        counts = collections.Counter()
+        for query in query_log:
+            tokens = sorted(set(token for token in tokenizer.word_tokenize(query) if token in lexicon))
+            for index, token_1 in enumerate(tokens):
+                for token_2 in tokens[index + 1:]:
+                    counts[(token_1, token_2)] += 1
+        candidates = [(count * min(lexicon.doc_freq(token_1), lexicon.doc_freq(token_2)), token_1, token_2)
+                      for (token_1, token_2), count in counts.items()]
+        return [(token_1, token_2) for _, token_1, token_2 in sorted(candidates, reverse=True)]
+
+    @staticmethod
+    def __intersect(list1, list2):
+        """
+        :param list1: A list of tuple (doc_id, score), sorted according to the document's id.
+        :param list2: Another posting list with the same structure.
+        :return: A posting list with the same structure, holding the documents present in both lists, with the score
+                 combined by Query._score_function
+        """
+        result = []
+        index_list1 = 0
+        index_list2 = 0
+        while index_list1 < len(list1) and index_list2 < len(list2):
+            document1, score_1 = list1[index_list1]
+            document2, score_2 = list2[index_list2]
+            if document1 == document2:
+                result.append((document1, Query._score_function(score_1, score_2)))
+                index_list1 += 1
+                index_list2 += 1
+            elif document1 < document2:
+                index_list1 += 1
+            else:
+                index_list2 += 1
+        return result
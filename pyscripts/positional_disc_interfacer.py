@@ -0,0 +1,160 @@
+from pyscripts.smart_disc_interfacer import SmartDiscInterfacer
+
+
+class PositionalPostingList(object):
+    """
+    Class made to represent the positional part of a posting list, as read from disc, without decoding it.
+    The directory of the documents is decoded on the first access, the positions of a document are only decoded
+    when asked for.
+    Initialize :
+        - bin_list : bytearray, the binary representation of a positional posting list, encoded by
+          <PositionalDiscInterfacer.encode_positional_list>
+
+    Attributes :
+        - __bin_list : bytearray, the binary representation of the positional posting list
+        - __directory : dictionary (key: integer, value: tuple), None until the first access. Associates a doc_id with
+          the (start, end) bounds of its encoded positions in __bin_list
+        - __decoded : dictionary (key: integer, value: list), the positions already decoded, by doc_id
+    """
+
+    def __init__(self, bin_list):
+        self.__bin_list = bin_list
+        self.__directory = None
+        self.__decoded = {}
+
+    def __build_directory(self):
+        """
+        Walk through the binary list, reading only the doc_ids and the sizes of the positions of each document
+        :return: None
+        """
+        self.__directory = {}
+        doc_id = 0
+        offset = 0
+        list_len = len(self.__bin_list)
+        while offset < list_len:
+            delta_doc_id, offset = PositionalDiscInterfacer._decode_number_variable_size_at(self.__bin_list, offset)
+            doc_id += delta_doc_id
+            positions_len, offset = PositionalDiscInterfacer._decode_number_variable_size_at(self.__bin_list, offset)
+            self.__directory[doc_id] = (offset, offset + positions_len)
+            offset += positions_len
+
+    def doc_ids(self):
+        """
+        :return: list of integer, the sorted doc_ids of the documents referenced by this positional posting list
+        """
+        if self.__directory is None:
+            self.__build_directory()
+        return sorted(self.__directory)
+
+    def positions(self, doc_id):
+        """
+        Decode the positions of a word in a document
+        :param doc_id: integer, the id of the document
+        :return: list of integer, the sorted positions of the word in the document. Empty if the document is not
+                 referenced by this positional posting list
+        """
+        if doc_id in self.__decoded:
+            return self.__decoded[doc_id]
+        if self.__directory is None:
+            self.__build_directory()
+        try:
+            start, end = self.__directory[doc_id]
+        except KeyError:
+            return []
+        positions = PositionalDiscInterfacer.decode_positions(self.__bin_list[start:end])
+        self.__decoded[doc_id] = positions
+        return positions
+
+    def items(self):
+        """
+        Decode the whole positional posting list
+        :return: list of tuples (doc_id, positions), sorted by doc_id
+        """
+        return [(doc_id, self.positions(doc_id)) for doc_id in self.doc_ids()]
+
+
+class PositionalDiscInterfacer(SmartDiscInterfacer):
+    """
+    Empty class used as namespace to encode and decode the positions of the words in the documents.
+    The positions are saved in their own file, next to the inverted file, with the same framing :
+    <key_size(key_len_len bytes)><key(key_size bytes)><list_len(list_len_len bytes)><positional list>
+    where the positional list is, for each document referencing the key :
+    <delta_doc_id (variable length)><positions_len (variable length)><positions (positions_len bytes)>
+    and the positions are :
+    <count (variable length)><position (variable length)><delta_position (variable length)> ...
+    """
+
+    format_name = 'positional'
+
+    def __init__(self):
+        super().__init__()
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------POSITIONAL ENCODING--------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    @classmethod
+    def encode_positions(cls, positions):
+        """
+        Encode a sorted list of positions as <count><position><delta_position>... over variable lengths
+        :param positions: list of integer, the sorted positions of a word in a document
+        :return: bytearray, the positions encoded
+        """
+        output = cls._encode_number_variable_size(len(positions))
+        last_position = 0
+        for position in positions:
+            output += cls._encode_number_variable_size(position - last_position)
+            last_position = position
+        return output
+
+    @classmethod
+    def encode_positional_list(cls, key, positional_content):
+        """
+        Encode a pair (key, positions by document) in binary, in the format :
+        <key_size(key_len_len bytes)><key(key_size bytes)><list_len(list_len_len bytes)>
+            ( <delta_doc_id (variable length)><positions_len (variable length)><positions (positions_len bytes)> )*N
+        :param key: string, a word, key of the map representing the index
+        :param positional_content: list, list of tuples (docid, positions) sorted by docid, where :
+                - docid : integer, id of an article
+                - positions : list of integer, the sorted positions of the word in the article
+        :return: bytearray, the pair encoded
+        """
+        output = bytearray()
+        last_id_encoded = 0
+        for (doc_id, positions) in positional_content:
+            bin_positions = cls.encode_positions(positions)
+            output += cls._encode_number_variable_size(doc_id - last_id_encoded)
+            output += cls._encode_number_variable_size(len(bin_positions))
+            output += bin_positions
+            last_id_encoded = doc_id
+        list_len = cls._encode_number(len(output), cls.list_len_len)
+        return cls._encode_key(key) + list_len + output
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------POSITIONAL DECODING--------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    @classmethod
+    def decode_positions(cls, bin_positions):
+        """
+        Decode the positions of a word in a document, encoded by <encode_positions>
+        :param bin_positions: bytearray, the binary representation of the positions
+        :return: list of integer, the sorted positions
+        """
+        count, offset = cls._decode_number_variable_size_at(bin_positions, 0)
+        positions = []
+        position = 0
+        for _ in range(count):
+            delta_position, offset = cls._decode_number_variable_size_at(bin_positions, offset)
+            position += delta_position
+            positions.append(position)
+        return positions
+
+    @classmethod
+    def decode_list(cls, bin_list):
+        """
+        Wrap a positional posting list without decoding it
+        :param bin_list: bytearray, the binary representation of a positional posting list
+        :return: PositionalPostingList, decoding the positions lazily
+        """
+        return PositionalPostingList(bin_list)
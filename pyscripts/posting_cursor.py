@@ -0,0 +1,353 @@
+import bisect
+
+
+class PostingCursor(object):
+    """
+    Class made to walk through a posting list in the order of the doc_ids, decoding it only as far as it is visited.
+    A cursor is positioned on its first posting when created, and is exhausted once it went past its last posting.
+    Attributes :
+        - posting_list : the decoded posting list the cursor walks through, None if the cursor decodes lazily
+        - _doc : integer, the doc_id of the current posting, None once the cursor is exhausted
+        - _score : integer, the score of the current posting, None once the cursor is exhausted
+        - _cost : integer, the number of postings of the posting list, or an estimate of it
+    """
+
+    posting_list = None
+
+    def __init__(self, cost):
+        self._doc = None
+        self._score = None
+        self._cost = cost
+
+    def doc(self):
+        """
+        :return: integer, the doc_id of the current posting, None if the cursor is exhausted
+        """
+        return self._doc
+
+    def score(self):
+        """
+        :return: integer, the score of the current posting, None if the cursor is exhausted
+        """
+        return self._score
+
+    def cost(self):
+        """
+        :return: integer, the number of postings of the posting list (an estimate for the cursors which do not know it
+                 before decoding the list)
+        """
+        return self._cost
+
+    def next(self):
+        """
+        Move to the next posting
+        :return: boolean, False if the cursor is exhausted
+        """
+        raise NotImplementedError
+
+    def advance(self, target_doc_id):
+        """
+        Move to the first posting whose doc_id is greater or equal to target_doc_id. The cursor never moves backward.
+        :param target_doc_id: integer, the doc_id to reach
+        :return: boolean, False if the cursor is exhausted
+        """
+        while self._doc is not None and self._doc < target_doc_id:
+            self.next()
+        return self._doc is not None
+
+    def reset(self):
+        """
+        Move back to the first posting
+        :return: None
+        """
+        raise NotImplementedError
+
+    def __iter__(self):
+        """
+        Walk through the postings from the current one, moving the cursor
+        :return: generator of tuples (doc_id, score)
+        """
+        while self._doc is not None:
+            yield self._doc, self._score
+            self.next()
+
+
+class ListPostingCursor(PostingCursor):
+    """
+    Class made to walk through a posting list already decoded (for the codecs which can not be decoded partially).
+    Initialize :
+        - posting_list : list of tuples (doc_id, score) sorted by doc_id, or any sequence behaving as such
+          (BitmapPostingList)
+    Attributes :
+        - __index : integer, the index of the current posting in the posting list
+    """
+
+    def __init__(self, posting_list):
+        super().__init__(len(posting_list))
+        self.posting_list = posting_list
+        self.__index = 0
+        self.__move(0)
+
+    def __move(self, index):
+        self.__index = index
+        if index < len(self.posting_list):
+            self._doc, self._score = self.posting_list[index]
+        else:
+            self._doc, self._score = None, None
+
+    def next(self):
+        self.__move(self.__index + 1)
+        return self._doc is not None
+
+    def advance(self, target_doc_id):
+        if self._doc is None or self._doc >= target_doc_id:
+            return self._doc is not None
+        min_index = self.__index + 1
+        max_index = len(self.posting_list)
+        while min_index < max_index:
+            mid = (min_index + max_index) // 2
+            if self.posting_list[mid][0] < target_doc_id:
+                min_index = mid + 1
+            else:
+                max_index = mid
+        self.__move(min_index)
+        return self._doc is not None
+
+    def reset(self):
+        self.__move(0)
+
+
+class FixedWidthPostingCursor(PostingCursor):
+    """
+    Class made to walk through a posting list encoded as (<doc_id(id_len bytes)><score(score_len bytes)>)*N, without
+    decoding it : only the postings visited and the ones probed by the binary search of <advance> are decoded.
+    Initialize :
+        - bin_list : bytes-like, the binary representation of the posting list (a memoryview avoids any copy)
+        - id_len : integer, the number of bytes of a doc_id
+        - score_len : integer, the number of bytes of a score
+        - offset : integer, the index of the first posting in bin_list. Default is 0
+    Attributes :
+        - __index : integer, the index of the current posting
+    """
+
+    def __init__(self, bin_list, id_len, score_len, offset=0):
+        self.__bin_list = bin_list
+        self.__id_len = id_len
+        self.__record_len = id_len + score_len
+        self.__offset = offset
+        super().__init__((len(bin_list) - offset) // self.__record_len)
+        self.__index = 0
+        self.__move(0)
+
+    def __doc_at(self, index):
+        start = self.__offset + index * self.__record_len
+        return int.from_bytes(self.__bin_list[start:start + self.__id_len], 'big')
+
+    def __move(self, index):
+        self.__index = index
+        if index < self._cost:
+            start = self.__offset + index * self.__record_len + self.__id_len
+            self._doc = self.__doc_at(index)
+            self._score = int.from_bytes(self.__bin_list[start:start + self.__record_len - self.__id_len], 'big')
+        else:
+            self._doc, self._score = None, None
+
+    def next(self):
+        self.__move(self.__index + 1)
+        return self._doc is not None
+
+    def advance(self, target_doc_id):
+        if self._doc is None or self._doc >= target_doc_id:
+            return self._doc is not None
+        min_index = self.__index + 1
+        max_index = self._cost
+        while min_index < max_index:
+            mid = (min_index + max_index) // 2
+            if self.__doc_at(mid) < target_doc_id:
+                min_index = mid + 1
+            else:
+                max_index = mid
+        self.__move(min_index)
+        return self._doc is not None
+
+    def reset(self):
+        self.__move(0)
+
+
+class VarintPostingCursor(PostingCursor):
+    """
+    Class made to walk through a posting list whose doc_ids are delta encoded over a variable length, decoding it block
+    by block : only the current block of postings is held in memory. The position and the first doc_id of every block
+    decoded are kept, so that going back (<reset>) and advancing again jumps to the right block without decoding the
+    previous ones again.
+    Initialize :
+        - bin_list : bytes-like, the binary representation of the posting list (a memoryview avoids any copy)
+        - decode_block : function of prototype [(list, integer) function(bin_list, offset, count, doc_id)], decoding at
+          most count postings from offset, doc_id being the last doc_id decoded before offset. It returns the
+          postings decoded and the offset following them
+        - offset : integer, the index of the first posting in bin_list. Default is 0
+        - cost : integer, the number of postings if known (from the lexicon). Default is estimated from the length
+    Attributes :
+        - __block : list of tuples (doc_id, score), the postings of the current block
+        - __block_docs : list of integer, the doc_ids of the current block
+        - __block_number : integer, the index of the current block
+        - __index : integer, the index of the current posting in the block
+        - __next_offset : integer, the offset of the block following the current one
+        - __block_firsts / __block_starts : lists, the first doc_id of every block decoded, and a tuple (offset, doc_id
+          before the block) to decode it again
+
+    Class Attributes :
+        - block_size : integer, the number of postings decoded at once
+    """
+
+    block_size = 128
+
+    def __init__(self, bin_list, decode_block, offset=0, cost=None):
+        super().__init__(cost if cost is not None else (len(bin_list) - offset) // 2)
+        self.__bin_list = bin_list
+        self.__decode_block = decode_block
+        self.__offset = offset
+        self.__block = []
+        self.__block_docs = []
+        self.__block_number = 0
+        self.__index = 0
+        self.__next_offset = offset
+        self.__block_firsts = []
+        self.__block_starts = []
+        self.reset()
+
+    def __load_block(self, block_number, offset, previous_doc_id):
+        """
+        Decode a block, and position the cursor on its first posting
+        :param block_number: integer, the index of the block
+        :param offset: integer, the position of the block in bin_list
+        :param previous_doc_id: integer, the last doc_id before the block
+        :return: None
+        """
+        if offset >= len(self.__bin_list):
+            self.__block, self.__block_docs = [], []
+            self._doc, self._score = None, None
+            return
+        self.__block, self.__next_offset = self.__decode_block(self.__bin_list, offset, self.block_size,
+                                                               previous_doc_id)
+        self.__block_docs = [doc_id for doc_id, _ in self.__block]
+        self.__block_number = block_number
+        if block_number == len(self.__block_firsts):
+            self.__block_firsts.append(self.__block_docs[0])
+            self.__block_starts.append((offset, previous_doc_id))
+        self.__move(0)
+
+    def __move(self, index):
+        self.__index = index
+        self._doc, self._score = self.__block[index]
+
+    def next(self):
+        if self._doc is None:
+            return False
+        if self.__index + 1 < len(self.__block):
+            self.__move(self.__index + 1)
+        else:
+            self.__load_block(self.__block_number + 1, self.__next_offset, self.__block_docs[-1])
+        return self._doc is not None
+
+    def advance(self, target_doc_id):
+        if self._doc is None or self._doc >= target_doc_id:
+            return self._doc is not None
+        known_block = bisect.bisect_right(self.__block_firsts, target_doc_id) - 1
+        if known_block > self.__block_number:
+            self.__load_block(known_block, *self.__block_starts[known_block])
+        while self.__block_docs[-1] < target_doc_id:
+            self.__load_block(self.__block_number + 1, self.__next_offset, self.__block_docs[-1])
+            if self._doc is None:
+                return False
+        self.__move(bisect.bisect_left(self.__block_docs, target_doc_id, self.__index))
+        return True
+
+    def reset(self):
+        self.__load_block(0, self.__offset, 0)
+
+
+class DequantizedPostingCursor(PostingCursor):
+    """
+    Class made to walk through a posting list whose scores are quantized (see ScoreQuantizer), returning the
+    dequantized scores.
+    Initialize :
+        - cursor : PostingCursor, the cursor on the quantized posting list
+        - dequantize : function of prototype [float function(integer)], mapping a quantized score on its value
+    """
+
+    def __init__(self, cursor, dequantize):
+        super().__init__(cursor.cost())
+        self.__cursor = cursor
+        self.__dequantize = dequantize
+        self.__update()
+
+    def __update(self):
+        self._doc = self.__cursor.doc()
+        self._score = self.__dequantize(self.__cursor.score()) if self._doc is not None else None
+
+    def next(self):
+        self.__cursor.next()
+        self.__update()
+        return self._doc is not None
+
+    def advance(self, target_doc_id):
+        self.__cursor.advance(target_doc_id)
+        self.__update()
+        return self._doc is not None
+
+    def reset(self):
+        self.__cursor.reset()
+        self.__update()
+
+
+class RangePostingCursor(PostingCursor):
+    """
+    Class made to walk through the doc_ids of some ranges, with a null score : intersected with the cursors of a query,
+    it restricts the query to the documents of the ranges (see DateIndex), the other cursors skipping the documents
+    outside of them through <advance>.
+    Initialize :
+        - ranges : list of tuples (first doc_id, last doc_id), sorted, disjoint, the last doc_id being included
+    Attributes :
+        - __range_index : integer, the index of the range of the current doc_id
+    """
+
+    def __init__(self, ranges):
+        super().__init__(sum(last - first + 1 for first, last in ranges))
+        self.__ranges = ranges
+        self.__lasts = [last for _, last in ranges]
+        self.__range_index = 0
+        self.reset()
+
+    def __move(self, range_index, doc_id=None):
+        """
+        Position the cursor in a range
+        :param range_index: integer, the index of the range
+        :param doc_id: integer, the doc_id to position the cursor on if it is in the range. Default is the first one
+        :return: None
+        """
+        self.__range_index = range_index
+        if range_index < len(self.__ranges):
+            first = self.__ranges[range_index][0]
+            self._doc = max(first, doc_id) if doc_id is not None else first
+            self._score = 0
+        else:
+            self._doc, self._score = None, None
+
+    def next(self):
+        if self._doc is None:
+            return False
+        if self._doc < self.__lasts[self.__range_index]:
+            self._doc += 1
+        else:
+            self.__move(self.__range_index + 1)
+        return self._doc is not None
+
+    def advance(self, target_doc_id):
+        if self._doc is None or self._doc >= target_doc_id:
+            return self._doc is not None
+        self.__move(bisect.bisect_left(self.__lasts, target_doc_id, self.__range_index), target_doc_id)
+        return self._doc is not None
+
+    def reset(self):
+        self.__move(0)
@@ -1,6 +1,16 @@
+import collections
+import heapq
+import os
+
 import nltk
 
+from pyscripts.bitmap_posting_list import BitmapPostingList
+from pyscripts.date_index import DateIndex
+from pyscripts.doc_id_map import DocIdMap
+from pyscripts.index_header import IndexHeader
+from pyscripts.index_reader import IndexReader
 from pyscripts.inverted_file import InvertedFile
+from pyscripts.query_planner import QueryPlan, QueryPlanner
 
 
 class Query:
@@ -16,6 +26,11 @@ class Query:
         - _conjunctive: whether the query is conjunctive or something else.
         - _filename: the path to the provided stored inverted file.
         - _query_token_list: the list of tokens in the query
+        - plan: the QueryPlan of the last execution, None before the first execution
+        - _lexicon / _pair_lexicon: the lexicons of the inverted file and of its pair index, once read
+        - _readers: dictionary, the IndexReader of the inverted file (key False) and of its pair index (key True)
+            shared by <share_readers>, None if the query opens its own readers
+        - _doc_id_map: the DocIdMap of the inverted file once read, None if its doc_ids have not been reassigned
     Error :
         - ValueError: if the query is empty.
         - NotImplementedError: if the query is not conjunctive.
@@ -28,6 +43,116 @@ class Query:
             raise NotImplementedError("Non-conjunctive query not yet supported")
         self._conjunctive = conjunctive
         self._filename = filename
+        self.plan = None
+        self._lexicon = None
+        self._pair_lexicon = None
+        self._readers = None
+        self._doc_id_map = None
+
+    def share_lexicons(self, lexicon, pair_lexicon=None, doc_id_map=None):
+        """
+        Use lexicons already read instead of reading them from the disc, so that the queries of a long running process
+        share the same lexicons
+        :param lexicon: Lexicon, the lexicon of the inverted file, None to read it
+        :param pair_lexicon: Lexicon, the lexicon of the pair index of the inverted file, None to read it if any
+        :param doc_id_map: DocIdMap, the map of the reassigned doc_ids of the inverted file, None to read it if any
+        :return: the query itself
+        """
+        self._lexicon = lexicon
+        self._pair_lexicon = pair_lexicon
+        self._doc_id_map = doc_id_map
+        return self
+
+    def share_readers(self, reader, pair_reader=None):
+        """
+        Read the posting lists through readers already opened instead of opening the inverted file for each execution,
+        so that the queries of a long running process share the same memory maps. The readers are not closed by the
+        query.
+        :param reader: IndexReader, opened on the inverted file
+        :param pair_reader: IndexReader, opened on the pair index of the inverted file, None if it has none
+        :return: the query itself
+        """
+        self._readers = {False: reader}
+        if pair_reader is not None:
+            self._readers[True] = pair_reader
+        return self.share_lexicons(reader.lexicon, pair_reader.lexicon if pair_reader is not None else None,
+                                   reader.doc_id_map)
+
+    def _plan(self, top_k, algorithm=None):
+        """
+        Plan the query from the document frequencies of the lexicon of the inverted file, before reading any posting
+        list. The plan is kept in self.plan.
+        :param top_k: The maximum number of document that will be returned.
+        :param algorithm: QueryPlan.NAIVE or QueryPlan.FAGIN to impose the algorithm, None to let the planner choose
+        :return: the Lexicon of the inverted file, None if it has none
+        """
+        if self._lexicon is None and os.path.exists(InvertedFile.lexicon_filename(self._filename)):
+            self._lexicon = InvertedFile.read_lexicon(self._filename)
+        pairs_filename = InvertedFile.pairs_filename(self._filename)
+        if self._pair_lexicon is None and os.path.exists(InvertedFile.lexicon_filename(pairs_filename)):
+            self._pair_lexicon = InvertedFile.read_lexicon(pairs_filename)
+        ids_filename = InvertedFile.ids_filename(self._filename)
+        if self._doc_id_map is None and self._readers is None and os.path.exists(ids_filename):
+            self._doc_id_map = DocIdMap.load(ids_filename)
+        self.plan = QueryPlanner(self._lexicon, self._pair_lexicon).plan(self._query_token_list, top_k, algorithm)
+        return self._lexicon
+
+    def _external_ids(self, results):
+        """
+        Translate the doc_ids of the result of a query back to the DOCIDs of the documents, if the doc_ids of the
+        inverted file have been reassigned (see DocIdMap)
+        :param results: list of tuples (doc_id, score), as computed on the inverted file
+        :return: list of tuples (doc_id, score), whose doc_ids are the DOCIDs of the documents
+        """
+        if self._doc_id_map is None:
+            return results
+        return self._doc_id_map.externalize(results)
+
+    def _date_cursor(self, date_range):
+        """
+        Open a cursor on the doc_ids of the documents written in a range of dates, read from the date index of the
+        inverted file (see DateIndex)
+        :param date_range: tuple (start, end) of datetime.date, the first and the last day (included) of the range,
+                either being None for no bound. None if the query is not restricted to a range of dates
+        :return: RangePostingCursor, None if date_range is None
+        :raise ValueError: if the inverted file has no date index
+        """
+        if date_range is None:
+            return None
+        if self._readers is not None:
+            date_index = self._readers[False].date_index()
+        else:
+            dates_filename = InvertedFile.dates_filename(self._filename)
+            date_index = DateIndex.load(dates_filename) if os.path.exists(dates_filename) else None
+        if date_index is None:
+            raise ValueError("The inverted file <{}> has no date index, it can not be restricted to a range of dates"
+                             .format(self._filename))
+        start, end = date_range
+        return date_index.cursor(start, end)
+
+    def _open_planned_cursors(self):
+        """
+        Open a cursor on the posting list of every token of self.plan, the pairs of tokens being read from the pair
+        index
+        :return: list of PostingCursor, in the order of self.plan.tokens. None if a token has no posting list
+        """
+        shared_readers = self._readers or {}
+        readers = {False: shared_readers.get(False)
+                   or IndexReader(self._filename, lexicon=self._lexicon, doc_id_map=self._doc_id_map)}
+        if self.plan.pairs:
+            readers[True] = (shared_readers.get(True)
+                             or IndexReader(InvertedFile.pairs_filename(self._filename), lexicon=self._pair_lexicon))
+        cursors = []
+        for token in self.plan.tokens:
+            cursor = readers[token in self.plan.pairs].cursor(token)
+            if cursor is None:
+                cursors = None
+                break
+            cursors.append(cursor)
+        for pairs, reader in readers.items():
+            if reader is not shared_readers.get(pairs):
+                reader.close()
+        return cursors
 
     @staticmethod
     def _score_function(score_1, score_2):
@@ -48,11 +173,13 @@ class NaiveQuery(Query):
     def __init__(self, query, tokenizer=nltk, filename="inverted_file.if", conjunctive=True):
         super().__init__(query, tokenizer, filename, conjunctive)
 
-    def execute(self, top_k=5):
+    def execute(self, top_k=5, date_range=None):
         """
         Execute the query represented by this instance, and return the result as a list of tuples.
         Each tuple has the document's id, then the score associated to this document.
         :param top_k: The maximum number of document that will be returned.
+        :param date_range: tuple (start, end) of datetime.date, to only return the documents written between start and
+                end (included), either being None for no bound. Default is None (no restriction)
         :return: A list of length max(top_k, len(valid_document)), where valid_document is the collections of document
                 that contains all documents matching all query terms.
                 The result is a list of tuples, the first tuple's element is the document id, the second is the score
@@ -60,24 +187,83 @@ class NaiveQuery(Query):
                 The documents in the list are the documents with the highest score according to the considered
                 query in all the corpus.
         """
+        result = self._matching_documents(top_k, date_range)
+        if isinstance(result, BitmapPostingList):
+            return self._external_ids(result.top(top_k))
+        return self._external_ids(sorted(result, key=lambda x: x[1], reverse=True)[:top_k])
+
+    def _matching_documents(self, top_k, date_range=None):
+        """
+        Compute the documents containing every query term, with their combined score.
+        The posting lists are intersected from the rarest to the most frequent term, as planned by <_plan>.
+        :param top_k: The maximum number of document that will be returned.
+        :param date_range: see <execute>
+        :return: A posting list, sorted according to the document's id, of tuples (doc_id, score)
+        """
         if not self._query_token_list:
             return []
 
-        inverted_file = InvertedFile(None)
-        inverted_file.read_posting_lists(self._query_token_list, self._filename)
-        try:
-            result = inverted_file.map[self._query_token_list[0]]
-        except KeyError:
+        self._plan(top_k, QueryPlan.NAIVE)
+        if self.plan.empty:
+            return []  # At least one token does not exist in the inverted file, the query can not return anything.
+
+        date_cursor = self._date_cursor(date_range)
+        if date_cursor is not None and date_cursor.doc() is None:
+            return []  # No document has been written in the range of dates.
+
+        cursors = self._open_planned_cursors()
+        if cursors is None:
             return []  # At least one token does not exist in the inverted file, the query can not return anything.
 
-        for token in self._query_token_list[1:]:
-            try:
-                current_token_posting_list = inverted_file.map[token]
-            except KeyError:
-                return []  # At least one token does not exist in the inverted file, the query can not return anything.
-            result = self.__merge_posting_list(result, current_token_posting_list)
+        # The dense posting lists, decoded as bitmaps, are intersected with vectorized operations, the other ones are
+        # walked through together from the rarest token, the result being probed in the bitmaps
+        result = None
+        sparse_cursors = []
+        for cursor in cursors:
+            dense_list = cursor.posting_list
+            if isinstance(dense_list, BitmapPostingList):
+                result = dense_list if result is None else self.__merge_posting_list(result, dense_list)
+            else:
+                sparse_cursors.append(cursor)
+        if date_cursor is not None:
+            # The range of dates is walked through with the sparse posting lists, as one of them : when it is the
+            # cheapest, it leads and the posting lists skip the documents written out of it before any score is computed
+            sparse_cursors.insert(len([cursor for cursor in sparse_cursors if cursor.cost() <= date_cursor.cost()]),
+                                  date_cursor)
+        if sparse_cursors:
+            matches = self.__intersect_cursors(sparse_cursors)
+            result = matches if result is None else self.__merge_posting_list(result, matches)
 
-        return sorted(result, key=lambda x: x[1], reverse=True)[:top_k]
+        return result
+
+    @classmethod
+    def __intersect_cursors(cls, cursors):
+        """
+        Walk through several posting lists at once : the first cursor leads, the other ones are advanced to its current
+        document, and the first one is advanced to the document of a cursor which went past it. A posting list is
+        only decoded as far as the documents it is advanced to.
+        :param cursors: list of PostingCursor, the rarest token first
+        :return: A posting list, sorted according to the document's id, of tuples (doc_id, score), holding the
+                documents present in every posting list. Their score is the one returned by the score function of the
+                class Query.
+        """
+        result = []
+        lead_cursor = cursors[0]
+        document = lead_cursor.doc()
+        while document is not None:
+            score = lead_cursor.score()
+            for cursor in cursors[1:]:
+                if not cursor.advance(document):
+                    return result
+                if cursor.doc() != document:
+                    lead_cursor.advance(cursor.doc())
+                    break
+                score = cls._score_function(score, cursor.score())
+            else:
+                result.append((document, score))
+                lead_cursor.next()
+            document = lead_cursor.doc()
+        return result
 
     @classmethod
     def __merge_posting_list(cls, list1, list2):
@@ -90,7 +276,14 @@ class NaiveQuery(Query):
         :return: A posting list with the same structure. This list contains a document iff the document was present in
                 the two provided lists. The score of this document will be the score returned by the score function of
                 the class Query.
+                If one of the lists is a BitmapPostingList, they are intersected with vectorized operations, and the
+                result is a BitmapPostingList when both are.
         """
+        if isinstance(list1, BitmapPostingList):
+            return list1.intersect(list2, cls._score_function)
+        if isinstance(list2, BitmapPostingList):
+            return list2.intersect(list1, lambda score_2, score_1: cls._score_function(score_1, score_2))
+
         result = []
 
         index_list1 = 0
@@ -114,6 +307,121 @@ class NaiveQuery(Query):
         return result
 
 
+class PhraseQuery(NaiveQuery):
+    """
+    This class represents a query whose terms must be found next to each other, in the order of the query.
+    The documents containing every term are first found as for a NaiveQuery, then the positions of the terms are
+    decoded for these documents only.
+    Precondition : the inverted file has been built with positional=True
+    It has the same initialization and attributes than Query, plus :
+        - _phrase_token_list: the list of tokens in the query, in order and with duplicates
+    """
+    def __init__(self, query, tokenizer=nltk, filename="inverted_file.if", conjunctive=True):
+        super().__init__(query, tokenizer, filename, conjunctive)
+        self._phrase_token_list = tokenizer.word_tokenize(query)
+
+    def execute(self, top_k=5, date_range=None):
+        """
+        Execute the query represented by this instance, and return the result as a list of tuples.
+        Each tuple has the document's id, then the score associated to this document.
+        :param top_k: The maximum number of document that will be returned.
+        :param date_range: see NaiveQuery.execute
+        :return: A list of length max(top_k, len(valid_document)), where valid_document is the collections of document
+                whose positions match the query (see <_match_positions>).
+                The result is a list of tuples, the first tuple's element is the document id, the second is the score
+                of the document. The list is sorted according to the score of the documents.
+        :raise ValueError: if the inverted file can not answer the query (see <_check_index>)
+        """
+        self._check_index()
+        candidates = self._matching_documents(top_k, date_range)
+        if not candidates:
+            return []
+
+        positions_lexicon = self._readers[False].positions_lexicon() if self._readers is not None else None
+        positional_lists = InvertedFile.read_positional_lists(self._query_token_list, self._filename, positions_lexicon)
+        result = []
+        for document, score in candidates:
+            positions = [positional_lists[token].positions(document) for token in self._phrase_token_list]
+            if self._match_positions(positions):
+                result.append((document, score))
+
+        return self._external_ids(sorted(result, key=lambda x: x[1], reverse=True)[:top_k])
+
+    def _check_index(self):
+        """
+        :return: None
+        :raise ValueError: if the inverted file has not been built with positional=True
+        """
+        if not os.path.exists(InvertedFile.positions_filename(self._filename)):
+            raise ValueError("The inverted file <{}> has no positions, it must be built with positional=True".format(
+                self._filename))
+
+    def _match_positions(self, positions):
+        """
+        :param positions: list of lists of integer, the ith element being the sorted positions in a document of the
+                ith token of the query
+        :return: True iff the tokens are found one after the other in the document
+        """
+        starts = set(positions[0])
+        for offset, token_positions in enumerate(positions[1:], 1):
+            token_positions = set(token_positions)
+            starts = {start for start in starts if start + offset in token_positions}
+            if not starts:
+                return False
+        return len(starts) > 0
+
+
+class ProximityQuery(PhraseQuery):
+    """
+    This class represents a query whose terms must all be found within a window of a given number of words,
+    in any order.
+    Precondition : the inverted file has been built with positional=True
+    It has the same initialization and attributes than PhraseQuery, plus :
+        - distance: the maximum number of words between the first and the last term of the window, lower than the
+            paragraph gap of the inverted file
+    """
+    def __init__(self, query, tokenizer=nltk, filename="inverted_file.if", conjunctive=True, distance=10):
+        super().__init__(query, tokenizer, filename, conjunctive)
+        self._phrase_token_list = self._query_token_list
+        self._distance = distance
+
+    def _check_index(self):
+        """
+        :return: None
+        :raise ValueError: if the inverted file has not been built with positional=True, or if the distance is not
+                lower than the gap left between its paragraphs (see InvertedFile.paragraph_gap), as a window could
+                then span two paragraphs
+        """
+        super()._check_index()
+        header = self._readers[False].header if self._readers is not None else IndexHeader.load(self._filename)
+        gap = header.options.get('paragraph_gap') if header is not None else None
+        if gap is not None and self._distance >= gap:
+            raise ValueError("The distance ({}) must be lower than the paragraph gap of the inverted file <{}> ({})"
+                             .format(self._distance, self._filename, gap))
+
+    def _match_positions(self, positions):
+        """
+        :param positions: list of lists of integer, the ith element being the sorted positions in a document of the
+                ith distinct token of the query
+        :return: True iff there is a window of at most distance words containing every token
+        """
+        events = heapq.merge(*[[(position, token_index) for position in token_positions]
+                               for token_index, token_positions in enumerate(positions)])
+        window = collections.deque()
+        count_in_window = collections.Counter()
+        for position, token_index in events:
+            window.append((position, token_index))
+            count_in_window[token_index] += 1
+            while window[0][0] < position - self._distance:
+                _, left_index = window.popleft()
+                count_in_window[left_index] -= 1
+                if count_in_window[left_index] == 0:
+                    del count_in_window[left_index]
+            if len(count_in_window) == len(positions):
+                return True
+        return False
+
+
 class FaginQuery(Query):
     """
     This class represents a query that will be executed with the Fagin's threshold algorithm.
@@ -122,11 +430,13 @@ class FaginQuery(Query):
     def __init__(self, query, tokenizer=nltk, filename="inverted_file.if", conjunctive=True):
         super().__init__(query, tokenizer, filename, conjunctive)
 
-    def execute(self, top_k=5):
+    def execute(self, top_k=5, date_range=None):
         """
         Execute the query represented by this instance, and return the result as a list of tuples.
         Each tuple has the document's id, then the score associated to this document.
         :param top_k: The maximum number of document that will be returned.
+        :param date_range: tuple (start, end) of datetime.date, to only return the documents written between start and
+                end (included), either being None for no bound. Default is None (no restriction)
         :return: A list of length max(top_k, len(valid_document)), where valid_document is the collections of document
                 that contains all documents matching all query terms.
                 The result is a list of tuples, the first tuple's element is the document id, the second is the score
@@ -135,19 +445,27 @@ class FaginQuery(Query):
                 query in all the corpus.
         """
         # In this method, pl stands for "posting_list"
-        inverted_file = InvertedFile(None)
-        inverted_file.read_posting_lists(self._query_token_list, self._filename)
+        self._plan(top_k, QueryPlan.FAGIN)
+        if self.plan.empty:
+            return []  # At least one token does not exist in the inverted file, the query can not return anything.
+
+        date_cursor = self._date_cursor(date_range)
+        if date_cursor is not None and date_cursor.doc() is None:
+            return []  # No document has been written in the range of dates.
 
-        # The ith element of used_pl_sorted_by_score and used_pl_sorted_by_doc_id
-        # correspond to the same document
+        used_cursors = self._open_planned_cursors()
+        if used_cursors is None:
+            return []  # At least one token does not exist in the inverted file, the query can not return anything.
+
+        # The ith element of used_pl_sorted_by_score and used_scores_by_doc_id correspond to the same token. The sorted
+        # accesses need every score of a posting list (of the documents written in the range of dates only), so each
+        # list is decoded once, and the random accesses are answered from the scores it decoded
         used_pl_sorted_by_score = []
-        used_pl_sorted_by_doc_id = []
-        for token in self._query_token_list:
-            try:
-                used_pl_sorted_by_doc_id.append(inverted_file.map[token])
-            except KeyError:
-                return []  # At least one token does not exist in the inverted file, the query can not return anything.
-            used_pl_sorted_by_score.append(self.__sort_by_score(used_pl_sorted_by_doc_id[-1]))
+        used_scores_by_doc_id = []
+        for cursor in used_cursors:
+            postings = list(cursor if date_cursor is None else self.__restrict_to_range(cursor, date_cursor))
+            used_scores_by_doc_id.append(dict(postings))
+            used_pl_sorted_by_score.append(self.__sort_by_score(postings))
 
         tau = float("inf")
         score_min = 1e9  # not initialize to infinity in order to go through the first step of the while loop
@@ -165,7 +483,7 @@ class FaginQuery(Query):
                     try:
                         document, current_document_score = (current_pl_sorted_by_score[index_in_current_pl])
                     except IndexError:  # All relevant documents have been seen
-                        return current_best
+                        return self._external_ids(current_best)
                     index_in_current_pl += 1
                     if document not in seen_documents:
                         seen_documents.add(document)
@@ -176,8 +494,8 @@ class FaginQuery(Query):
                 # Search other posting list to compute the score of the current document
                 for other_pl_index, index_in_other_pl in enumerate(index_table):
                     if current_pl_index != other_pl_index:
-                        other_pl = used_pl_sorted_by_doc_id[other_pl_index]
-                        other_document_score = self.__find_score_by_doc_id(other_pl, document)
+                        other_document_score = self.__find_score_by_doc_id(used_scores_by_doc_id[other_pl_index],
+                                                                           document)
                         current_document_score = self._score_function(current_document_score, other_document_score)
 
                 # If a word is not in the document, a negative score will be affected
@@ -197,40 +515,46 @@ class FaginQuery(Query):
                         _, tau_i = used_pl_sorted_by_score[tau_pl_index][index_in_tau_pl - 1]
                         tau += tau_i
 
-        return current_best
+        return self._external_ids(current_best)
+
+    @staticmethod
+    def __restrict_to_range(cursor, range_cursor):
+        """
+        Walk through the postings of a cursor whose document is in the doc_ids of another cursor, the cursor skipping
+        the other documents through <advance>
+        :param cursor: PostingCursor, the cursor on a posting list, moved to its end
+        :param range_cursor: RangePostingCursor, the doc_ids to keep, walked through from its beginning
+        :return: generator of tuples (doc_id, score)
+        """
+        range_cursor.reset()
+        while cursor.doc() is not None:
+            if not range_cursor.advance(cursor.doc()):
+                return
+            if range_cursor.doc() == cursor.doc():
+                yield cursor.doc(), cursor.score()
+                cursor.next()
+            else:
+                cursor.advance(range_cursor.doc())
 
     @staticmethod
-    def __find_score_by_doc_id(posting_list, doc_id, default_value=-1000000):
+    def __find_score_by_doc_id(scores_by_doc_id, doc_id, default_value=-1000000):
         """
-        Given a posting list and a document's id, returned the score associated with the document in the posting list.
-        If the document is not in the provided posting list, return default_value.
-        :param posting_list: The posting list that will be searched for the document.
+        Given the scores of a posting list and a document's id, returned the score associated with the document in the
+        posting list. If the document is not in the provided posting list, return default_value.
+        :param scores_by_doc_id: dictionary (key: integer, value: score), the scores of the posting list by doc_id
         :param doc_id: The id of the document from which the score will be retrieved.
         :param default_value: The score returned if the document is not in the posting list. Default is -1000000.
         :return: The score associated to the document whose id is doc_id. If no such document is in the posting list,
                 return the default value instead.
         """
-        min_index = 0
-        max_index = len(posting_list)
-        while min_index < max_index:
-            mid = (min_index + max_index) // 2
-            if doc_id > posting_list[mid][0]:
-                min_index = mid + 1
-            elif doc_id < posting_list[mid][0]:
-                max_index = mid
-            else:
-                break
-
-        if doc_id == posting_list[mid][0]:
-            return posting_list[mid][1]
-        else:
-            return default_value
+        return scores_by_doc_id.get(doc_id, default_value)
 
     @staticmethod
     def __sort_by_score(posting_list):
         """
         Given a posting list, return the same posting list, but sorted according to the score of the documents.
-        :param posting_list: A list of tuples, with the first element being the document's id, and the second the score.
+        :param posting_list: A list of tuples, with the first element being the document's id, and the second the score,
+                or a PostingCursor walking through such a list.
         :return: The posting list sorted according to the score. The docuement with the highest score is the first
                 element of the list.
         """
@@ -260,3 +584,35 @@ class FaginQuery(Query):
             else:
                 low_index = mid + 1
         list_.insert(low_index, x)
+
+
+class PlannedQuery(Query):
+    """
+    This class represents a query executed with the algorithm of lowest estimated cost, naive or Fagin's threshold
+    algorithm, chosen by a QueryPlanner from the document frequencies of the query terms and top_k.
+    It has the same initialization and attributes than Query.
+    """
+    def __init__(self, query, tokenizer=nltk, filename="inverted_file.if", conjunctive=True):
+        super().__init__(query, tokenizer, filename, conjunctive)
+        self.__query = query
+        self.__tokenizer = tokenizer
+
+    def execute(self, top_k=5, date_range=None):
+        """
+        Execute the query represented by this instance with the planned algorithm.
+        :param top_k: The maximum number of document that will be returned.
+        :param date_range: see NaiveQuery.execute
+        :return: see NaiveQuery.execute
+        """
+        self._plan(top_k)
+        if self.plan.empty:
+            return []
+        query_class = FaginQuery if self.plan.algorithm == QueryPlan.FAGIN else NaiveQuery
+        query = query_class(self.__query, self.__tokenizer, self._filename, self._conjunctive)
+        if self._readers is not None:
+            query.share_readers(self._readers[False], self._readers.get(True))
+        else:
+            query.share_lexicons(self._lexicon, self._pair_lexicon, self._doc_id_map)
+        result = query.execute(top_k, date_range)
+        self.plan = query.plan
+        return result
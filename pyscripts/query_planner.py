@@ -0,0 +1,179 @@
+import math
+
+
+class QueryPlan(object):
+    """
+    Class made to describe how a conjunctive query is going to be executed, before any posting list is read.
+    Initialize :
+        - tokens : list of string, the tokens of the query, in the order their posting lists will be intersected
+        - doc_freqs : dictionary (key: string, value: integer), the number of documents of each token, None if the
+          inverted file has no lexicon
+        - algorithm : string, one of QueryPlan.NAIVE, QueryPlan.FAGIN and QueryPlan.EMPTY (at least one token is absent
+          from the inverted file, nothing has to be read)
+        - costs : dictionary (key: string, value: float), the estimated cost of each algorithm considered
+        - pairs : list of string, the keys of tokens which are read from the pair index (see PairIndex) instead of
+          their two posting lists. Each of them is one of the tokens of the plan
+    """
+
+    NAIVE = 'naive'
+    FAGIN = 'fagin'
+    EMPTY = 'empty'
+
+    def __init__(self, tokens, doc_freqs, algorithm, costs=None, pairs=None):
+        self.tokens = tokens
+        self.doc_freqs = doc_freqs
+        self.algorithm = algorithm
+        self.costs = costs if costs is not None else {}
+        self.pairs = pairs if pairs is not None else []
+
+    @property
+    def empty(self):
+        """
+        :return: boolean, True iff the query can not match any document
+        """
+        return self.algorithm == self.EMPTY
+
+    def __repr__(self):
+        return 'QueryPlan(algorithm={}, tokens={}, doc_freqs={}, costs={}, pairs={})'.format(
+            self.algorithm, self.tokens, self.doc_freqs, self.costs, self.pairs)
+
+
+class QueryPlanner(object):
+    """
+    Class made to plan conjunctive queries from the document frequencies found in the lexicon of an inverted file.
+    The costs are expressed in number of postings handled, weighted by the following class attributes, which can be
+    tuned on the benchmarks :
+        - decode_weight : the cost of decoding a posting, paid for every posting of the query by Fagin, and for the
+          postings the cursors land on by the naive algorithm
+        - merge_weight : the cost of comparing two doc_ids, when a cursor searches the document it is advanced to
+        - sort_weight : the cost of a comparison when sorting a posting list by score (Fagin only)
+        - access_weight : the cost of an access to a posting list, by score or by doc_id (Fagin only)
+    Initialize :
+        - lexicon : Lexicon, the lexicon of the inverted file. If None, the queries are planned without statistics
+        - pair_lexicon : Lexicon, the lexicon of the pair index of the inverted file, None if it has none
+
+    Attributes :
+        - __lexicon : the lexicon sent in parameter for __init__
+        - __pair_lexicon : the pair_lexicon sent in parameter for __init__
+    """
+
+    decode_weight = 1.0
+    merge_weight = 1.0
+    sort_weight = 0.1
+    access_weight = 4.0
+
+    def __init__(self, lexicon, pair_lexicon=None):
+        self.__lexicon = lexicon
+        self.__pair_lexicon = pair_lexicon
+
+    @staticmethod
+    def pair_key(token_1, token_2):
+        """
+        :param token_1: string, a token
+        :param token_2: string, another token
+        :return: string, the key of the pair of tokens in a pair index, whatever their order
+        """
+        return ' '.join(sorted((token_1, token_2)))
+
+    def plan(self, tokens, top_k, algorithm=None):
+        """
+        Plan a conjunctive query :
+            - if a token is absent from the lexicon, the plan is EMPTY
+            - the pairs of tokens found in the pair index replace their two posting lists, the pairs saving the most
+              postings being chosen first
+            - the tokens are ordered from the rarest to the most frequent, so that every intermediate result of the
+              naive intersection is as small as possible
+            - the algorithm of lowest estimated cost is chosen, unless one is imposed
+        :param tokens: list of string, the distinct tokens of the query
+        :param top_k: integer, the maximum number of documents the query returns
+        :param algorithm: string, QueryPlan.NAIVE or QueryPlan.FAGIN to impose the algorithm. Default is None
+        :return: QueryPlan, the plan of the query
+        """
+        if self.__lexicon is None:
+            return QueryPlan(list(tokens), None, algorithm or QueryPlan.NAIVE)
+
+        doc_freqs = {token: self.__lexicon.doc_freq(token) for token in tokens}
+        tokens = sorted(tokens, key=lambda token: (doc_freqs[token], token))
+        if not tokens or doc_freqs[tokens[0]] == 0:
+            return QueryPlan(tokens, doc_freqs, QueryPlan.EMPTY)
+
+        pairs = self.__substitute_pairs(tokens, doc_freqs)
+        if pairs:
+            paired_tokens = {token for pair in pairs for token in pair.split(' ')}
+            tokens = [token for token in tokens if token not in paired_tokens] + pairs
+            doc_freqs = {token: self.__pair_lexicon.doc_freq(token) if token in pairs else doc_freqs[token]
+                         for token in tokens}
+            tokens = sorted(tokens, key=lambda token: (doc_freqs[token], token))
+            if doc_freqs[tokens[0]] == 0:
+                return QueryPlan(tokens, doc_freqs, QueryPlan.EMPTY, pairs=pairs)
+
+        costs = {
+            QueryPlan.NAIVE: self.__naive_cost(tokens, doc_freqs),
+            QueryPlan.FAGIN: self.__fagin_cost(tokens, doc_freqs, top_k),
+        }
+        if algorithm is None:
+            algorithm = min(costs, key=lambda name: costs[name])
+        return QueryPlan(tokens, doc_freqs, algorithm, costs, pairs)
+
+    def __substitute_pairs(self, tokens, doc_freqs):
+        """
+        Choose the pairs of tokens to read from the pair index, greedily, each token being in at most one pair
+        :param tokens: list of string, the distinct tokens of the query
+        :param doc_freqs: dictionary (key: string, value: integer), the number of documents of each token
+        :return: list of string, the keys of the chosen pairs
+        """
+        if self.__pair_lexicon is None:
+            return []
+
+        candidates = []
+        for index, token_1 in enumerate(tokens):
+            for token_2 in tokens[index + 1:]:
+                key = self.pair_key(token_1, token_2)
+                if key in self.__pair_lexicon:
+                    saving = doc_freqs[token_1] + doc_freqs[token_2] - self.__pair_lexicon.doc_freq(key)
+                    candidates.append((saving, key, token_1, token_2))
+
+        pairs = []
+        paired_tokens = set()
+        for _, key, token_1, token_2 in sorted(candidates, reverse=True):
+            if token_1 not in paired_tokens and token_2 not in paired_tokens:
+                pairs.append(key)
+                paired_tokens.update((token_1, token_2))
+        return pairs
+
+    @classmethod
+    def __naive_cost(cls, tokens, doc_freqs):
+        """
+        The posting lists are walked through together with cursors (see NaiveQuery) : the rarest list leads and is
+        entirely decoded, and every document of the running result advances the cursors of the other lists, skipping
+        the postings between two documents with a search instead of decoding them (the varint lists, decoded block by
+        block, are estimated as the other ones). The running result is never longer than the rarest list seen so far
+        :param tokens: list of string, the tokens, sorted by document frequency
+        :param doc_freqs: dictionary (key: string, value: integer), the number of documents of each token
+        :return: float, the estimated cost
+        """
+        running_len = doc_freqs[tokens[0]]
+        cost = cls.decode_weight * running_len
+        for token in tokens[1:]:
+            doc_freq = doc_freqs[token]
+            # each advance decodes the posting it lands on, after a search over about doc_freq / running_len postings
+            cost += running_len * (cls.decode_weight + cls.merge_weight * math.log2(doc_freq / running_len + 1))
+            running_len = min(running_len, doc_freq)
+        return cost
+
+    @classmethod
+    def __fagin_cost(cls, tokens, doc_freqs, top_k):
+        """
+        Every list is decoded, sorted by score and indexed by doc_id, then the lists are read in parallel until the
+        top_k are known, each sorted access implying a lookup of the document in the index of every other list
+        :param tokens: list of string, the tokens, sorted by document frequency
+        :param doc_freqs: dictionary (key: string, value: integer), the number of documents of each token
+        :param top_k: integer, the maximum number of documents the query returns
+        :return: float, the estimated cost
+        """
+        cost = cls.decode_weight * sum(doc_freqs.values())
+        cost += cls.sort_weight * sum(df * math.log2(df + 1) for df in doc_freqs.values())
+        # at least top_k documents are read in each list, more when the lists have few documents in common
+        sorted_accesses = len(tokens) * min(doc_freqs[tokens[0]], top_k * len(tokens))
+        cost += cls.access_weight * sorted_accesses * len(tokens)
+        return cost
@@ -0,0 +1,541 @@
+import argparse
+import asyncio
+import collections
+import datetime
+import http
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from pyscripts.document_store import DocumentStoreReader
+from pyscripts.index_reader import IndexReader
+from pyscripts.inverted_file import InvertedFile
+from pyscripts.load_generator import QUERY_CLASSES, TOKENIZERS, LoadGenerator, make_tokenizer
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------WORKER---------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+_worker = {}
+
+
+def _init_worker(filename):
+    """
+    Open the inverted file and its pair index once for every query the worker evaluates. Defined at module level to
+    be sent to the processes of the pool.
+    :param filename: string, the path of the inverted file
+    :return: None
+    """
+    pairs_filename = InvertedFile.pairs_filename(filename)
+    _worker['filename'] = filename
+    _worker['tokenizer'] = make_tokenizer('split')
+    _worker['reader'] = IndexReader(filename)
+    _worker['pair_reader'] = IndexReader(pairs_filename) if os.path.exists(pairs_filename) else None
+
+
+def _close_worker():
+    """
+    Close the readers opened by <_init_worker>
+    :return: None
+    """
+    for key in ('reader', 'pair_reader'):
+        if _worker.get(key) is not None:
+            _worker.pop(key).close()
+
+
+def _evaluate(query_class_name, tokens, top_k, date_range=None):
+    """
+    Evaluate a query in a worker prepared by <_init_worker>. Defined at module level to be sent to the processes of
+    the pool.
+    :param query_class_name: string, a key of QUERY_CLASSES
+    :param tokens: list of string, the tokens of the query, already tokenized by the server
+    :param top_k: integer, the maximum number of documents returned
+    :param date_range: tuple (start, end) of datetime.date, see NaiveQuery.execute. Default is None
+    :return: list of tuples (doc_id, score) of python numbers, sorted according to the score of the documents
+    """
+    query = QUERY_CLASSES[query_class_name](' '.join(tokens), _worker['tokenizer'], _worker['filename'])
+    results = query.share_readers(_worker['reader'], _worker['pair_reader']).execute(top_k, date_range)
+    return [(int(doc_id), score.item() if hasattr(score, 'item') else score) for doc_id, score in results]
+
+
+class HttpError(Exception):
+    """
+    Error answered to a client with an HTTP status
+    Initialize :
+        - status : integer, the HTTP status of the answer
+        - message : string, the description of the error
+        - headers : dictionary, additional headers of the answer. Default is None
+    """
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------SERVER---------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+class QueryServer(object):
+    """
+    Class made to serve the queries on an inverted file from a long running process, over HTTP on a local TCP port or
+    on a Unix socket. The inverted file is opened once per worker, the queries being evaluated in a bounded pool of
+    worker processes (or threads) while the event loop keeps accepting requests. Identical queries (same algorithm,
+    same tokens, same top_k, same range of dates) received while one of them is being evaluated are answered with the
+    same evaluation, and the last results are cached.
+    Endpoints :
+        - GET /search?q=<query>&k=<top_k>&algorithm=<naive|fagin|planned>&start=<YYYY-MM-DD>&end=<YYYY-MM-DD>, or
+          POST /search with a JSON body {"query": ..., "top_k": ..., "algorithm": ..., "start": ..., "end": ...} : the
+          results of the query, as JSON. start and end (included) are optional and restrict the results to the
+          documents written between them, the inverted file needing a date index (see DateIndex)
+        - GET /health : the state of the server
+        - GET /metrics : the counters of the server, the hit rates of its caches and its latency percentiles
+    Backpressure : a search is answered 503 when max_pending evaluations are already running or waiting for a
+    worker, and a connection is answered 503 and closed when max_connections connections are already open. A
+    connection is closed when a request, or the next request of a kept alive connection, takes more than read_timeout
+    seconds to be received.
+    Initialize :
+        - filename : string, the path of the inverted file
+        - workers : integer, the number of queries evaluated at once. Default is 1
+        - threads : boolean, whether the workers are threads of the server instead of processes. Default is False
+        - tokenizer : string, one of TOKENIZERS, the tokenizer of the queries. Default is 'split', which needs no nltk
+          data
+        - algorithm : string, a key of QUERY_CLASSES, the algorithm of the queries which do not give one.
+          Default is 'planned'
+        - max_pending : integer, the number of evaluations running or waiting for a worker. Default is 4 * workers
+        - max_connections : integer, the number of connections open at once. Default is 256
+        - cache_size : integer, the number of results kept in the cache of results, 0 to disable it. Default is 1024
+        - documents_filename : string, the path of a document store the results are hydrated from. Default is None
+        - timeout : float, the number of seconds a search waits for its evaluation before being answered 504.
+          Default is 30
+        - max_top_k : integer, the highest top_k a search may ask. Default is 1000
+        - read_timeout : float, the number of seconds a connection may stay idle, or take to send a request, before
+          being closed. Default is 10
+
+    Attributes :
+        - __in_flight : dictionary, the futures of the evaluations running or waiting for a worker, by query key
+        - __cache : OrderedDict, the results of the last queries by query key, from the least to the most recently used
+        - __latencies : deque, the latencies of the last searches answered, in seconds
+        - __counters : Counter, the counters reported by /metrics
+    Class Attributes :
+        - max_header_size : integer, the number of bytes of the request line and the headers of a request
+        - max_body_size : integer, the number of bytes of the body of a request
+        - latency_window : integer, the number of searches the latency percentiles are computed on
+    """
+
+    max_header_size = 16 * 1024
+    max_body_size = 64 * 1024
+    latency_window = 4096
+
+    def __init__(self, filename, workers=1, threads=False, tokenizer='split', algorithm='planned', max_pending=None,
+                 max_connections=256, cache_size=1024, documents_filename=None, timeout=30, max_top_k=1000,
+                 read_timeout=10):
+        if algorithm not in QUERY_CLASSES:
+            raise ValueError('Unknown algorithm <{}>'.format(algorithm))
+        if tokenizer not in TOKENIZERS:
+            raise ValueError('Unknown tokenizer <{}>'.format(tokenizer))
+        if workers < 1:
+            raise ValueError('At least one worker is needed')
+        self.__filename = filename
+        self.__workers = workers
+        self.__threads = threads
+        self.__tokenizer = make_tokenizer(tokenizer)
+        self.__algorithm = algorithm
+        self.__max_pending = max_pending if max_pending is not None else 4 * workers
+        self.__max_connections = max_connections
+        self.__cache_size = cache_size
+        self.__documents = DocumentStoreReader(documents_filename) if documents_filename else None
+        self.__timeout = timeout
+        self.__max_top_k = max_top_k
+        self.__read_timeout = read_timeout
+        self.__executor = None
+        self.__in_flight = {}
+        self.__cache = collections.OrderedDict()
+        self.__latencies = collections.deque(maxlen=self.latency_window)
+        self.__counters = collections.Counter()
+        self.__connections = 0
+        self.__start_time = time.time()
+
+    def start_executor(self):
+        """
+        Start the pool of workers, each of them opening the inverted file. The worker processes are all started here,
+        before the server listens : a process forked later, while connections are open, would inherit their sockets
+        and keep them open after the server closes them, so that the clients would never see the end of the stream
+        :return: None
+        """
+        if self.__threads:
+            _init_worker(self.__filename)
+            self.__executor = ThreadPoolExecutor(max_workers=self.__workers)
+        else:
+            self.__executor = ProcessPoolExecutor(max_workers=self.__workers, initializer=_init_worker,
+                                                  initargs=(self.__filename,))
+        # The pool forks its processes as the tasks arrive, one task per worker starts them all
+        for future in [self.__executor.submit(time.sleep, 0.01) for _ in range(self.__workers)]:
+            future.result()
+
+    def close(self):
+        """
+        Shut the pool of workers down, and close the files opened by the server
+        :return: None
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+        if self.__threads:
+            _close_worker()
+        if self.__documents is not None:
+            self.__documents.close()
+
+    async def serve(self, host='127.0.0.1', port=8080, path=None):
+        """
+        Serve the requests until the process receives SIGINT or SIGTERM
+        :param host: string, the address the server listens on. Default is 127.0.0.1 (local clients only)
+        :param port: integer, the port the server listens on. Default is 8080
+        :param path: string, the path of a Unix socket to listen on instead of host and port. Default is None
+        :return: None
+        """
+        self.start_executor()
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path, limit=self.max_header_size)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=self.max_header_size)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, stop.set)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            self.close()
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------SEARCH---------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    async def search(self, query, top_k=10, algorithm=None, date_range=None):
+        """
+        Answer a query : from the cache of results, from the evaluation of an identical query in flight, or from a new
+        evaluation in the pool of workers
+        :param query: string, the query
+        :param top_k: integer, the maximum number of documents returned. Default is 10
+        :param algorithm: string, a key of QUERY_CLASSES, None for the default algorithm of the server
+        :param date_range: tuple (start, end) of datetime.date, see NaiveQuery.execute. Default is None
+        :return: dictionary, with the tokens of the query, the algorithm, top_k, the range of dates, the results
+                 (list of dictionaries with the doc_id, the score and the document if the server hydrates the results),
+                 and whether they come from the cache or from a coalesced evaluation
+        :raise HttpError: 400 if the query is not valid, 503 if too many evaluations are pending, 504 if the evaluation
+                lasted more than the timeout, 500 if it failed
+        """
+        algorithm = algorithm or self.__algorithm
+        if algorithm not in QUERY_CLASSES:
+            raise HttpError(400, 'Unknown algorithm <{}>'.format(algorithm))
+        if not 0 < top_k <= self.__max_top_k:
+            raise HttpError(400, 'top_k must be between 1 and {}'.format(self.__max_top_k))
+        tokens = sorted(set(self.__tokenizer.word_tokenize(query)))
+        if not tokens:
+            raise HttpError(400, 'A query must be non-empty')
+
+        if date_range == (None, None):
+            date_range = None
+        key = (algorithm, tuple(tokens), top_k, date_range)
+        answer = {'tokens': tokens, 'algorithm': algorithm, 'top_k': top_k, 'cached': False, 'coalesced': False}
+        if date_range is not None:
+            answer['start'], answer['end'] = (date.isoformat() if date is not None else None for date in date_range)
+        if key in self.__cache:
+            self.__counters['cache_hits'] += 1
+            self.__cache.move_to_end(key)
+            results = self.__cache[key]
+            answer['cached'] = True
+        else:
+            self.__counters['cache_misses'] += 1
+            future = self.__in_flight.get(key)
+            if future is not None:
+                self.__counters['coalesced'] += 1
+                answer['coalesced'] = True
+            else:
+                if len(self.__in_flight) >= self.__max_pending:
+                    self.__counters['rejected'] += 1
+                    raise HttpError(503, 'Too many pending queries', {'Retry-After': '1'})
+                future = self.__evaluate(key)
+            try:
+                # Shielded, so that a client going away does not cancel the evaluation shared with other clients
+                results = await asyncio.wait_for(asyncio.shield(future), self.__timeout)
+            except asyncio.TimeoutError:
+                self.__counters['timeouts'] += 1
+                raise HttpError(504, 'The query took more than {} seconds'.format(self.__timeout))
+            except ValueError as error:
+                raise HttpError(400, str(error))
+            except Exception as error:
+                self.__counters['errors'] += 1
+                raise HttpError(500, '{}: {}'.format(type(error).__name__, error))
+
+        if self.__documents is not None:
+            answer['results'] = [{'doc_id': doc_id, 'score': score, 'document': document}
+                                 for doc_id, score, document in self.__documents.hydrate(results)]
+        else:
+            answer['results'] = [{'doc_id': doc_id, 'score': score} for doc_id, score in results]
+        return answer
+
+    def __evaluate(self, key):
+        """
+        Submit the evaluation of a query to the pool of workers. It is registered as in flight until it is done, then
+        its results are cached
+        :param key: tuple (algorithm, tokens, top_k, date_range), the query
+        :return: asyncio.Future, the results of the query
+        """
+        self.__counters['evaluations'] += 1
+        future = asyncio.wrap_future(self.__executor.submit(_evaluate, key[0], list(key[1]), key[2], key[3]))
+        self.__in_flight[key] = future
+
+        def done(future):
+            del self.__in_flight[key]
+            if self.__cache_size > 0 and not future.cancelled() and future.exception() is None:
+                self.__cache[key] = future.result()
+                if len(self.__cache) > self.__cache_size:
+                    self.__cache.popitem(last=False)
+
+        future.add_done_callback(done)
+        return future
+
+    def health(self):
+        """
+        :return: dictionary, the state of the server
+        """
+        return {'status': 'ok' if self.__executor is not None else 'stopped', 'index': self.__filename,
+                'uptime_s': time.time() - self.__start_time}
+
+    def metrics(self):
+        """
+        :return: dictionary, the counters of the server, the hit rates of its caches and the latency percentiles of the
+                 last searches answered
+        """
+        latencies = sorted(latency * 1000 for latency in self.__latencies)
+        hits, misses = self.__counters['cache_hits'], self.__counters['cache_misses']
+        metrics = {
+            'uptime_s': time.time() - self.__start_time,
+            'workers': self.__workers,
+            'connections': {'open': self.__connections, 'max': self.__max_connections,
+                            'rejected': self.__counters['rejected_connections'],
+                            'timed_out': self.__counters['timed_out_connections']},
+            'requests': {name[len('requests '):]: count for name, count in self.__counters.items()
+                         if name.startswith('requests ')},
+            'responses': {name[len('responses '):]: count for name, count in self.__counters.items()
+                          if name.startswith('responses ')},
+            'searches': {'evaluations': self.__counters['evaluations'], 'coalesced': self.__counters['coalesced'],
+                         'pending': len(self.__in_flight), 'max_pending': self.__max_pending,
+                         'rejected': self.__counters['rejected'], 'timeouts': self.__counters['timeouts'],
+                         'errors': self.__counters['errors']},
+            'caches': {'results': {'hits': hits, 'misses': misses, 'size': len(self.__cache),
+                                   'hit_rate': hits / (hits + misses) if hits + misses else None}},
+            'latency_ms': {'p{}'.format(p): LoadGenerator.percentile(latencies, p) for p in (50, 95, 99)},
+        }
+        metrics['latency_ms']['max'] = latencies[-1] if latencies else None
+        if self.__documents is not None:
+            hits, misses = self.__documents.hits, self.__documents.misses
+            metrics['caches']['document_store'] = {'hits': hits, 'misses': misses,
+                                                   'hit_rate': hits / (hits + misses) if hits + misses else None}
+        return metrics
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------HTTP-----------------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    async def handle_connection(self, reader, writer):
+        """
+        Answer the requests of a connection (HTTP/1.1, kept alive unless the client asks otherwise)
+        :param reader: asyncio.StreamReader, the stream of the requests
+        :param writer: asyncio.StreamWriter, the stream of the answers
+        :return: None
+        """
+        if self.__connections >= self.__max_connections:
+            self.__counters['rejected_connections'] += 1
+            await self.__write_response(writer, 503, {'error': 'Too many connections'}, False, {'Retry-After': '1'})
+            writer.close()
+            return
+
+        self.__connections += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    method, target, headers, body = await self.__read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.TimeoutError:
+                    self.__counters['timed_out_connections'] += 1
+                    break
+                except HttpError as error:
+                    await self.__write_response(writer, error.status, {'error': str(error)}, False, error.headers)
+                    break
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                status, payload, extra_headers = await self.__route(method, target, body)
+                await self.__write_response(writer, status, payload, keep_alive, extra_headers)
+        except ConnectionError:
+            pass
+        finally:
+            self.__connections -= 1
+            writer.close()
+
+    async def __read_request(self, reader):
+        """
+        :param reader: asyncio.StreamReader, the stream of the requests
+        :return: a tuple (method, target, headers, body) : the headers are a dictionary whose keys are lower case
+        :raise HttpError: 400 if the request is malformed, 413 if its head or its body is too large
+        :raise asyncio.TimeoutError: if the head or the body is not received within read_timeout seconds
+        """
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.__read_timeout)
+        except asyncio.LimitOverrunError:
+            raise HttpError(413, 'Request head too large')
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HttpError(400, 'Malformed request line')
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(400, 'Malformed Content-Length')
+        if length > self.max_body_size:
+            raise HttpError(413, 'Request body too large')
+        body = await asyncio.wait_for(reader.readexactly(length), self.__read_timeout) if length > 0 else b''
+        return method.upper(), target, headers, body
+
+    async def __route(self, method, target, body):
+        """
+        :param method: string, the method of the request
+        :param target: string, the target of the request (path and query string)
+        :param body: bytes, the body of the request
+        :return: a tuple (status, payload, headers), the answer to the request
+        """
+        start = time.perf_counter()
+        url = urlsplit(target)
+        self.__counters['requests ' + url.path] += 1
+        try:
+            if url.path == '/health' and method == 'GET':
+                payload = self.health()
+            elif url.path == '/metrics' and method == 'GET':
+                payload = self.metrics()
+            elif url.path == '/search' and method in ('GET', 'POST'):
+                payload = await self.search(*self.__search_parameters(method, url, body))
+                self.__latencies.append(time.perf_counter() - start)
+            elif url.path in ('/health', '/metrics', '/search'):
+                raise HttpError(405, 'Method {} not allowed on {}'.format(method, url.path))
+            else:
+                raise HttpError(404, 'Unknown path {}'.format(url.path))
+        except HttpError as error:
+            self.__counters['responses {}'.format(error.status)] += 1
+            return error.status, {'error': str(error)}, error.headers
+        self.__counters['responses 200'] += 1
+        return 200, payload, {}
+
+    @staticmethod
+    def __search_parameters(method, url, body):
+        """
+        :param method: string, GET or POST
+        :param url: SplitResult, the target of the request
+        :param body: bytes, the body of the request
+        :return: a tuple (query, top_k, algorithm, date_range), the parameters of <search>
+        :raise HttpError: 400 if the parameters are missing or malformed
+        """
+        if method == 'POST':
+            try:
+                parameters = json.loads(body.decode('utf-8'))
+                query, top_k, algorithm = parameters['query'], parameters.get('top_k', 10), parameters.get('algorithm')
+                start, end = parameters.get('start'), parameters.get('end')
+            except (ValueError, KeyError, TypeError, AttributeError):
+                raise HttpError(400, 'The body must be a JSON object with a "query"')
+        else:
+            parameters = parse_qs(url.query)
+            if 'q' not in parameters:
+                raise HttpError(400, 'Missing parameter q')
+            query, top_k = parameters['q'][0], parameters.get('k', [10])[0]
+            algorithm = parameters.get('algorithm', [None])[0]
+            start, end = parameters.get('start', [None])[0], parameters.get('end', [None])[0]
+        if not isinstance(query, str):
+            raise HttpError(400, 'The query must be a string')
+        try:
+            top_k = int(top_k)
+        except (ValueError, TypeError):
+            raise HttpError(400, 'top_k must be an integer')
+        try:
+            date_range = tuple(datetime.date.fromisoformat(date) if date is not None else None for date in (start, end))
+        except (ValueError, TypeError):
+            raise HttpError(400, 'start and end must be dates formatted as YYYY-MM-DD')
+        return query, top_k, algorithm, date_range
+
+    @staticmethod
+    async def __write_response(writer, status, payload, keep_alive, headers):
+        """
+        :param writer: asyncio.StreamWriter, the stream of the answers
+        :param status: integer, the HTTP status of the answer
+        :param payload: object, serialized as the JSON body of the answer
+        :param keep_alive: boolean, whether the connection is kept open after the answer
+        :param headers: dictionary, additional headers of the answer
+        :return: None
+        """
+        body = json.dumps(payload).encode('utf-8')
+        head = ['HTTP/1.1 {} {}'.format(status, http.HTTPStatus(status).phrase),
+                'Content-Type: application/json',
+                'Content-Length: {}'.format(len(body)),
+                'Connection: {}'.format('keep-alive' if keep_alive else 'close')]
+        head.extend('{}: {}'.format(name, value) for name, value in headers.items())
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------COMMAND LINE---------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+def main(argv=None):
+    """
+    Serve the queries on an inverted file until SIGINT or SIGTERM.
+    Usage : python -m pyscripts.query_server <inverted file> [--port 8080 | --unix <socket path>] [options], see --help
+    :param argv: list of string, the arguments of the command line. Default is sys.argv[1:]
+    :return: None
+    """
+    parser = argparse.ArgumentParser(prog='python -m pyscripts.query_server',
+                                     description='Serve the queries on an inverted file over HTTP, on a local port or '
+                                                 'on a Unix socket.')
+    parser.add_argument('index', help='the path of the inverted file')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', default=None, help='the path of a Unix socket to listen on instead of a port')
+    parser.add_argument('--workers', type=int, default=1, help='the number of queries evaluated at once')
+    parser.add_argument('--threads', action='store_true', help='use threads instead of processes as workers')
+    parser.add_argument('--tokenizer', choices=TOKENIZERS, default='split',
+                        help='the tokenizer of the queries. stemming and nltk download the nltk data they need')
+    parser.add_argument('--algorithm', choices=sorted(QUERY_CLASSES), default='planned')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='the number of evaluations running or queued before searches are answered 503')
+    parser.add_argument('--max-connections', type=int, default=256)
+    parser.add_argument('--cache-size', type=int, default=1024, help='the number of results cached, 0 to disable')
+    parser.add_argument('--documents', default=None, help='the path of a document store the results are hydrated from')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--read-timeout', type=float, default=10,
+                        help='the number of seconds a connection may stay idle before being closed')
+    args = parser.parse_args(argv)
+
+    server = QueryServer(args.index, args.workers, args.threads, args.tokenizer, args.algorithm, args.max_pending,
+                         args.max_connections, args.cache_size, args.documents, args.timeout,
+                         read_timeout=args.read_timeout)
+    asyncio.run(server.serve(args.host, args.port, args.unix))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
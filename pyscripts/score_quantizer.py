@@ -0,0 +1,174 @@
+import math
+import struct
+
+import numpy as np
+
+from pyscripts.bitmap_posting_list import BitmapPostingList
+from pyscripts.posting_cursor import DequantizedPostingCursor, ListPostingCursor
+
+
+class ScoreQuantizer(object):
+    """
+    Class made to quantize the scores of an inverted file over 8 or 16 bits when it is saved or merged, and to
+    dequantize them when it is read. A score s of the range [0, max_score] is mapped on one of the levels
+    0 .. 2**bits - 1, either linearly : q = round(s / max_score * levels), or logarithmically :
+    q = round(log(1 + s) / log(1 + max_score) * levels), which keeps more resolution for the low scores.
+    max_score is either the highest score of the whole index, recorded in the header of the inverted file (per index),
+    or the highest score of each posting list, saved in front of the list (per term) :
+    <key_size(key_len_len bytes)><key(key_size bytes)><list_len(list_len_len bytes)><max_score(8 bytes)><encoded list>
+    Initialize :
+        - bits : integer, 8 or 16, the number of bits of a quantized score. Default is 8
+        - scale : string, LINEAR or LOG. Default is LINEAR
+        - per_term : boolean, whether max_score is the one of each posting list instead of the one of the index.
+          Default is False
+        - max_score : float, the highest score of the index, None until <fit> is called. Unused if per_term
+
+    Class Attributes :
+        - max_score_len : integer, the number of bytes of the max_score saved in front of a posting list (per term)
+    """
+
+    LINEAR = 'linear'
+    LOG = 'log'
+    max_score_len = 8
+
+    def __init__(self, bits=8, scale=LINEAR, per_term=False, max_score=None):
+        if bits not in (8, 16):
+            raise ValueError('Scores can only be quantized over 8 or 16 bits, not {}'.format(bits))
+        if scale not in (self.LINEAR, self.LOG):
+            raise ValueError('Unknown quantization scale <{}>'.format(scale))
+        self.bits = bits
+        self.scale = scale
+        self.per_term = per_term
+        self.max_score = max_score
+        self.levels = 2 ** bits - 1
+
+    def options(self):
+        """
+        :return: dictionary, the parameters of the quantizer, to be recorded in the header of an inverted file
+        """
+        options = {'bits': self.bits, 'scale': self.scale, 'per_term': self.per_term}
+        if not self.per_term:
+            options['max_score'] = self.max_score
+        return options
+
+    @classmethod
+    def from_options(cls, options):
+        """
+        :param options: dictionary, the parameters of a quantizer, as returned by <options>
+        :return: ScoreQuantizer, the quantizer described by the options
+        """
+        return cls(options['bits'], options['scale'], options['per_term'], options.get('max_score'))
+
+    def fit(self, max_score):
+        """
+        Set the highest score of the index, before saving it (per index quantization only)
+        :param max_score: float, the highest score of the index
+        :return: None
+        """
+        self.max_score = max_score
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------QUANTIZATION---------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    def quantize(self, score, max_score):
+        """
+        :param score: number, a score of the range [0, max_score]
+        :param max_score: number, the highest score of the range
+        :return: integer, the level of the score, between 0 and 2**bits - 1
+        """
+        if score < 0:
+            raise ValueError('Only non negative scores can be quantized ({})'.format(score))
+        if max_score <= 0:
+            return 0
+        if self.scale == self.LINEAR:
+            ratio = score / max_score
+        else:
+            ratio = math.log1p(score) / math.log1p(max_score)
+        return min(self.levels, int(round(ratio * self.levels)))
+
+    def dequantize(self, level, max_score):
+        """
+        :param level: integer or numpy array of integer, quantized scores
+        :param max_score: number, the highest score of the range the scores were quantized from
+        :return: float or numpy array of float, the scores the levels stand for
+        """
+        ratio = level / self.levels
+        if self.scale == self.LINEAR:
+            return ratio * max_score
+        if isinstance(ratio, np.ndarray):
+            return np.expm1(ratio * math.log1p(max_score))
+        return math.expm1(ratio * math.log1p(max_score))
+
+    def dequantize_list(self, posting_list, max_score):
+        """
+        :param posting_list: list of tuples (doc_id, quantized score), or BitmapPostingList
+        :param max_score: number, the highest score of the range the scores were quantized from
+        :return: the same posting list, with the scores dequantized
+        """
+        if isinstance(posting_list, BitmapPostingList):
+            return posting_list.with_scores(self.dequantize(posting_list.scores(), max_score))
+        return [(doc_id, self.dequantize(level, max_score)) for doc_id, level in posting_list]
+
+#----------------------------------------------------------------------------------------------------------------------------------------#
+#-------------------------------------------------------------INTERFACER-----------------------------------------------------------------#
+#----------------------------------------------------------------------------------------------------------------------------------------#
+
+    def __list_max_score(self, posting_list):
+        """
+        :param posting_list: list of tuples (doc_id, score)
+        :return: float, the max_score the posting list is quantized with
+        """
+        if not self.per_term:
+            return self.max_score
+        return max((score for _, score in posting_list), default=0)
+
+    def __split_max_score(self, bin_list):
+        """
+        :param bin_list: bytes-like, the binary representation of a quantized posting list
+        :return: a tuple (max_score, bin_list), bin_list being the encoded list of quantized scores
+        """
+        if not self.per_term:
+            return self.max_score, bin_list
+        max_score = struct.unpack('>d', bytes(bin_list[:self.max_score_len]))[0]
+        return max_score, memoryview(bin_list)[self.max_score_len:]
+
+    def interfacer(self, disc_interfacer):
+        """
+        Build the interfacer saving and reading an inverted file with the scores quantized by this quantizer
+        :param disc_interfacer: class, the interfacer encoding the quantized posting lists
+        :return: class, a subclass of disc_interfacer, whose scores are score_len = bits / 8 bytes long, quantizing the
+                 scores in <encode_posting_list> and dequantizing them in <decode_list> and <cursor>
+        """
+        quantizer = self
+        levels_interfacer = type(disc_interfacer.__name__, (disc_interfacer,), {'score_len': self.bits // 8})
+
+        def encode_posting_list(cls, key, map_content, **encode_options):
+            map_content = list(map_content)
+            max_score = quantizer.__list_max_score(map_content)
+            levels = [(doc_id, quantizer.quantize(score, max_score)) for doc_id, score in map_content]
+            record = levels_interfacer.encode_posting_list(key, levels, **encode_options)
+            if not quantizer.per_term:
+                return record
+            list_start = cls.key_len_len + cls.decode_number(record[:cls.key_len_len])
+            list_len = cls.decode_number(record[list_start:list_start + cls.list_len_len])
+            return (record[:list_start] + cls._encode_number(list_len + quantizer.max_score_len, cls.list_len_len)
+                    + struct.pack('>d', max_score) + record[list_start + cls.list_len_len:])
+
+        def decode_list(cls, bin_list):
+            max_score, bin_list = quantizer.__split_max_score(bin_list)
+            return quantizer.dequantize_list(levels_interfacer.decode_list(bin_list), max_score)
+
+        def cursor(cls, bin_list, cost=None):
+            max_score, bin_list = quantizer.__split_max_score(bin_list)
+            levels_cursor = levels_interfacer.cursor(bin_list, cost)
+            if levels_cursor.posting_list is not None:
+                return ListPostingCursor(quantizer.dequantize_list(levels_cursor.posting_list, max_score))
+            return DequantizedPostingCursor(levels_cursor, lambda level: quantizer.dequantize(level, max_score))
+
+        return type(disc_interfacer.__name__, (levels_interfacer,), {
+            'quantizer': self,
+            'encode_posting_list': classmethod(encode_posting_list),
+            'decode_list': classmethod(decode_list),
+            'cursor': classmethod(cursor),
+        })
@@ -0,0 +1,181 @@
+import bisect
+import heapq
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import nltk
+
+from pyscripts.index_reader import IndexReader
+from pyscripts.inverted_file import InvertedFile
+from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer as ndi
+from pyscripts.query import NaiveQuery
+from pyscripts.tokenizer import SplitTokenizer
+
+
+class ShardedInvertedFile(object):
+    """
+    Class made to build an index partitioned by ranges of doc_id : each shard is a complete InvertedFile (with its
+    lexicon), holding the documents whose doc_id is in its range. A manifest, saved under the given filename,
+    describes the shards.
+    Initialize :
+        - score_function : see InvertedFile. The scores only depend on the token and the document, so they are the
+          same whatever the shard the document falls in
+        - shard_bounds : list of integer, sorted. The ith shard holds the documents whose doc_id is in
+          [shard_bounds[i-1], shard_bounds[i]), the first shard starting at 0 and the last one being unbounded. There
+          are len(shard_bounds) + 1 shards
+        - disc_interfacer : class, one of NaiveDiscInterfacer and SmartDiscInterfacer, the way the shards are encoded
+        - positional : boolean, whether the shards must be positional (see InvertedFile)
+
+    Attributes :
+        - shards : list of InvertedFile, one per range of doc_id
+        - __shard_bounds : the shard_bounds sent in parameter for __init__
+    """
+
+    def __init__(self, score_function, shard_bounds, disc_interfacer=ndi, positional=False):
+        self.__shard_bounds = sorted(shard_bounds)
+        self.shards = [InvertedFile(score_function, disc_interfacer, positional)
+                       for _ in range(len(self.__shard_bounds) + 1)]
+
+    @staticmethod
+    def shard_filename(filename, shard_index):
+        """
+        :param filename: string, the path of the manifest of a sharded index
+        :param shard_index: integer, the index of a shard
+        :return: string, the path of the inverted file of the shard
+        """
+        return '{}.shard{}'.format(filename, shard_index)
+
+    def add_document(self, document):
+        """
+        Add an article in the shard its doc_id belongs to.
+        :param document : dictionary, an element of the list <FormattedDocument.matches>
+        :return: None
+        """
+        shard_index = bisect.bisect_right(self.__shard_bounds, document['id'])
+        self.shards[shard_index].add_document(document)
+
+    def save(self, filename, quantizer=None):
+        """
+        Save every shard, and the manifest describing them
+        :param filename: string, the path of the manifest. The shards are saved next to it (see <shard_filename>)
+        :param quantizer: ScoreQuantizer, None by default. If given, the scores of every shard are saved quantized by
+                          it (see InvertedFile.save)
+        :return: None
+        """
+        lower_bounds = [0] + self.__shard_bounds
+        upper_bounds = self.__shard_bounds + [None]
+        manifest = {'shards': []}
+        for shard_index, shard in enumerate(self.shards):
+            shard_filename = self.shard_filename(filename, shard_index)
+            shard.save(shard_filename, quantizer=quantizer)
+            manifest['shards'].append({
+                'filename': os.path.basename(shard_filename),
+                'min_doc_id': lower_bounds[shard_index],
+                'max_doc_id': upper_bounds[shard_index],
+            })
+        with open(filename, 'w+') as f:
+            json.dump(manifest, f)
+
+
+_shard_worker = {}
+
+
+def _init_shard_worker(shards):
+    """
+    Open the inverted file of every shard once per process of the pool, with the lexicons already read by the
+    coordinator, so that the queries neither read a lexicon nor open a shard again. Defined at module level to be
+    sent to the processes of the pool.
+    :param shards: list of tuples (filename, lexicon), one per shard
+    :return: None
+    """
+    _shard_worker['shards'] = [(filename, IndexReader(filename, lexicon=lexicon)) for filename, lexicon in shards]
+
+
+def _execute_on_shard(query_class, tokens, shard_index, top_k):
+    """
+    Execute a query on one shard, in a process prepared by <_init_shard_worker>. Defined at module level to be sent
+    to the processes of the pool.
+    :param query_class: class, NaiveQuery or FaginQuery
+    :param tokens: list of string, the tokens of the query
+    :param shard_index: integer, the index of the shard
+    :param top_k: integer, the maximum number of documents returned by the shard
+    :return: list of tuples (doc_id, score), the top_k documents of the shard
+    """
+    filename, reader = _shard_worker['shards'][shard_index]
+    query = query_class(' '.join(tokens), SplitTokenizer, filename).share_readers(reader)
+    return [tuple(result) for result in query.execute(top_k)]
+
+
+class ShardCoordinator(object):
+    """
+    Class made to execute queries over a sharded index : the query is executed on every shard in parallel, with the
+    semantics of query_class, then the top_k of each shard are merged into the global top_k. As the shards hold
+    disjoint sets of documents, the global top_k is always among the top_k of the shards. Each process of the pool
+    opens every shard once, with the lexicons read by the coordinator.
+    Initialize :
+        - filename : string, the path of the manifest of a sharded index
+        - query_class : class, NaiveQuery or FaginQuery, the algorithm executed on each shard. Default is NaiveQuery
+        - max_workers : integer, the number of processes of the pool. Default is the number of processors
+
+    Attributes :
+        - __shards : list of tuples (filename, lexicon), one per shard
+        - __query_class : the query_class sent in parameter for __init__
+        - __executor : ProcessPoolExecutor, the pool executing the queries on the shards
+    """
+
+    def __init__(self, filename, query_class=NaiveQuery, max_workers=None):
+        with open(filename, 'r') as f:
+            manifest = json.load(f)
+        directory = os.path.dirname(filename)
+        self.__shards = []
+        for shard in manifest['shards']:
+            shard_filename = os.path.join(directory, shard['filename'])
+            self.__shards.append((shard_filename, InvertedFile.read_lexicon(shard_filename)))
+        self.__query_class = query_class
+        self.__executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_shard_worker,
+                                              initargs=(self.__shards,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Shut the pool of processes down
+        :return: None
+        """
+        self.__executor.shutdown()
+
+    def doc_freq(self, token):
+        """
+        :param token: string, a token
+        :return: integer, the number of documents of the whole collection containing the token
+        """
+        return sum(lexicon.doc_freq(token) for _, lexicon in self.__shards)
+
+    def execute(self, query, tokenizer=nltk, top_k=5):
+        """
+        Execute a conjunctive query on every shard, and return the global result as a list of tuples.
+        The shards which do not contain every token of the query are not queried at all.
+        :param query: string, the words to search
+        :param tokenizer: the tokenizer used to build the index
+        :param top_k: The maximum number of document that will be returned.
+        :return: A list of at most top_k tuples (doc_id, score), sorted according to the score of the documents.
+        """
+        tokens = list(set(tokenizer.word_tokenize(query)))
+        if not tokens:
+            raise ValueError("A query must be non-empty")
+
+        futures = []
+        for shard_index, (_, lexicon) in enumerate(self.__shards):
+            if all(token in lexicon for token in tokens):
+                futures.append(self.__executor.submit(_execute_on_shard, self.__query_class, tokens, shard_index,
+                                                      top_k))
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return heapq.nlargest(top_k, results, key=lambda x: x[1])
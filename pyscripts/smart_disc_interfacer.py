@@ -1,4 +1,5 @@
 from pyscripts.naive_disc_interfacer import NaiveDiscInterfacer
+from pyscripts.posting_cursor import VarintPostingCursor
 
 class SmartDiscInterfacer(NaiveDiscInterfacer):
     """
@@ -7,7 +8,8 @@ class SmartDiscInterfacer(NaiveDiscInterfacer):
     <doc_id (variable length)><score (score_len bytes)> <delta_doc_id (variable_length)><score (score_len bytes)> ...
     """
     
-    last_id_decoded = 0
+    format_name = 'smart'
+
     def __init__(self):
         super().__init__()
     
@@ -16,23 +18,21 @@ class SmartDiscInterfacer(NaiveDiscInterfacer):
 #----------------------------------------------------------------------------------------------------------------------------------------#
 
     @classmethod
-    def __encode_number_variable_size(cls, number):
+    def _encode_number_variable_size(cls, number):
         """
         Encode an number in binary over a variable number of bytes.
-        It encodes the number byte per byte over 7 bits per bytes. The strongest bit
-        of each byte indicate if the newt byte still belongs to the number (yes=1, no=0)
+        It encodes the number byte per byte over 7 bits per bytes, strongest bits first. The strongest bit
+        of each byte indicate if the next byte still belongs to the number (yes=1, no=0)
         :param number: integer, the number to be binary encoded
         :return: bytearray, a representation of the number encoded
         """
         
-        n_list = []
-        while number > 127:
-            to_encode_now = [(number %128) + 128]
+        n_list = [number % 128]
+        number >>= 7
+        while number > 0:
+            n_list.append((number % 128) + 128)
             number >>= 7
-            n_list = to_encode_now + n_list
-        
-        to_encode_now = [(number %128)]
-        n_list = to_encode_now + n_list
+        n_list.reverse()
         output = bytearray(n_list)
         return output
 
@@ -43,7 +43,7 @@ class SmartDiscInterfacer(NaiveDiscInterfacer):
         :param doc_id : integer, the number to encode
         :return: bytearray, the number encoded
         """
-        return cls.__encode_number_variable_size(doc_id)
+        return cls._encode_number_variable_size(doc_id)
 
     @classmethod
     def __encode_list(cls, map_content):
@@ -88,47 +88,34 @@ class SmartDiscInterfacer(NaiveDiscInterfacer):
     def decode_number_variable_size(cls, file):
         """
         Convert a binary number of an unknown size into an integer
-        Precondition : the number has been encoded following the method <encode_number_variable_size>
+        Precondition : the number has been encoded following the method <_encode_number_variable_size>
         :param file: bytearray, a binary representation of at least the number in which to read the number byte per byte
         :return: 
             - integer, unsigned decimal representation of the input number
             - bytearray, the array privated from the byte read
         """
-        int_val = 0
-        it = 0
-        while True:
-            bin_part = file[it]
-            it += 1
-            to_be_decoded = bin_part & 0x01111111
-            keep_on = bin_part & 0x10000000
-            int_val += to_be_decoded
-            if keep_on > 0:
-                int_val <<= 7
-            else:
-                break
-        
+        int_val, it = cls._decode_number_variable_size_at(file, 0)
         file = file[it:]
         return int_val, file
-    
+
     @classmethod
-    def __decode_article(cls, bin_list):
+    def _decode_number_variable_size_at(cls, bin_list, offset):
         """
-        Decode the binary representation of an element of a posting list of shape (doc_id, score)
-        :param bin_list: bytearray, the binary representation of a posting list, from which the next article is extracted
-        :return: a tuple (doc_id, score, bin_list) where :
-            - doc_id : integer, the unique id of an paper article
-            - score : integer, the score of this article relative to the keyword of this posting list
-            - bin_list : bytearray, the array privated from the read bytes
+        Convert a binary number of an unknown size into an integer, without copying the array it is read from
+        Precondition : the number has been encoded following the method <_encode_number_variable_size>
+        :param bin_list: bytearray, a binary representation containing the number
+        :param offset: integer, the index of the first byte of the number in bin_list
+        :return: 
+            - integer, unsigned decimal representation of the input number
+            - integer, the index of the first byte following the number
         """
-        doc_id, bin_list = cls.decode_number_variable_size(bin_list)
-        doc_id += cls.last_id_decoded
-        cls.last_id_decoded = doc_id
-        
-        bin_score = bin_list[:super().id_len]
-        score = cls.decode_number(bin_score)
-        
-        bin_list = bin_list[super().id_len:]
-        return doc_id, score, bin_list
+        int_val = 0
+        while True:
+            bin_part = bin_list[offset]
+            offset += 1
+            int_val = (int_val << 7) + (bin_part & 0x7F)
+            if not bin_part & 0x80:
+                return int_val, offset
     
     @classmethod
     def decode_list(cls, bin_list):
@@ -140,10 +127,35 @@ class SmartDiscInterfacer(NaiveDiscInterfacer):
             - doc_id : integer, the unique id of an paper article
             - score : integer, the score of this article relative to the keyword of this posting list
         """
+        return cls._decode_block(bin_list, 0, len(bin_list), 0)[0]
+
+    @classmethod
+    def _decode_block(cls, bin_list, offset, count, doc_id):
+        """
+        Decode a part of a binary posting list
+        :param bin_list: bytes-like, the binary representation of a posting list
+        :param offset: integer, the index of the first byte to decode
+        :param count: integer, the maximum number of postings to decode
+        :param doc_id: integer, the last doc_id decoded before offset (0 at the beginning of the list)
+        :return: a tuple (postings, offset), where postings is a list of tuples (doc_id, score) and offset the index of
+                 the first byte following them
+        """
         output = []
-        while len(bin_list) > 0:
-            doc_id, score, bin_list = cls.__decode_article(bin_list)
+        list_len = len(bin_list)
+        while offset < list_len and len(output) < count:
+            delta_doc_id, offset = cls._decode_number_variable_size_at(bin_list, offset)
+            doc_id += delta_doc_id
+            score = cls.decode_number(bin_list[offset:offset + cls.score_len])
+            offset += cls.score_len
             output.append((doc_id, score))
+        return output, offset
 
-        cls.last_id_decoded = 0
-        return output
+    @classmethod
+    def cursor(cls, bin_list, cost=None):
+        """
+        Open a cursor on a binary posting list, decoding it block by block
+        :param bin_list: bytes-like, the binary representation of a posting list
+        :param cost: integer, the number of postings if known. Default is an estimate from the length of bin_list
+        :return: PostingCursor, positioned on the first posting
+        """
+        return VarintPostingCursor(bin_list, cls._decode_block, 0, cost)
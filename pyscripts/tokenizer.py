@@ -1,6 +1,19 @@
 import nltk
 
-nltk.download('punkt')
+
+class SplitTokenizer(object):
+    """
+    Class made to tokenize texts that are already tokenized, by splitting them on their white spaces. It needs no nltk
+    data, so it is the one of the query logs, of the queries sent to the shards and of the tests.
+    """
+
+    @staticmethod
+    def word_tokenize(paragraph):
+        """
+        :param paragraph: string, the text to process
+        :return: list of string, the tokens of the text
+        """
+        return paragraph.split()
 
 
 class Tokenizer:
@@ -11,12 +24,17 @@ class Tokenizer:
             - punctuation : A list of symbols you want to remove from the tokens if they are found alone.
                 Default is ['!', '?', '.', ',', ';', ':', '"', "'", '(', ')', '-', "''", '``']
             - stemming : Whether you want to perform stemming on tokens or not. The method used is Porter's algorithm.
+    The nltk data it needs is only downloaded when it is not already installed, the first time a Tokenizer is created.
     Attributes :
         - __punctuation : A list of lone symbols to filter from tokens.
         - __stemmer : A chosen stemmer to use.
     """
 
     def __init__(self, punctuation=['!', '?', '.', ',', ';', ':', '"', "'", '(', ')', '-', "''", '``'], stemming=True):
+        try:
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            nltk.download('punkt')
         self.__punctuation = punctuation
         if stemming:
             self.__stemmer = nltk.stem.porter.PorterStemmer()